@@ -0,0 +1,61 @@
+# benchmark/bench_capture.py
+"""
+截屏方式测速：对比各截屏后端全屏及详情面板、状态图标区域的截取耗时
+无显示器的 Linux 机器上可在 Xvfb 中运行（在项目根目录下）：
+    xvfb-run -s "-screen 0 3440x1440x24" python -m benchmark.bench_capture --count 200
+"""
+import argparse
+import logging
+
+from utils.metrics import StageMetrics
+from utils.screen_source import SCREEN_BACKENDS
+
+logger = logging.getLogger(__name__)
+
+# 测速的截取区域 (left, top, right, bottom)，None 为全屏
+REGIONS = {
+    "full": None,
+    "detail_panel": (2600, 150, 3350, 1000),
+    "state_icon": (3070, 400, 3350, 500),
+}
+
+
+def run(backends, count):
+    """
+    逐个后端、逐个区域连续截取 count 次
+    :param backends: 后端名列表
+    :param count: 每个区域的截取次数
+    :return: {"后端.区域": 耗时统计}
+    """
+    stats = StageMetrics()
+    for backend in backends:
+        try:
+            source = SCREEN_BACKENDS[backend]()
+        except ImportError as e:
+            print(f"跳过 {backend}: {str(e)}")
+            continue
+        for name, region in REGIONS.items():
+            # 首次截取包含初始化和缓冲分配，不计入统计
+            source.grab(region)
+            for _ in range(count):
+                with stats.stage(f"{backend}.{name}"):
+                    source.grab(region)
+    return stats.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="截屏方式测速")
+    parser.add_argument("--backend", choices=sorted(SCREEN_BACKENDS), action="append",
+                        help="要测试的后端，可重复指定，默认全部")
+    parser.add_argument("--count", type=int, default=100, help="每个区域的截取次数")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    summary = run(args.backend or sorted(SCREEN_BACKENDS), args.count)
+    print(f"{'后端.区域':<24}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for name, item in summary.items():
+        print(f"{name:<24}{item['p50_ms']:>8.2f}ms{item['p95_ms']:>8.2f}ms{item['p99_ms']:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
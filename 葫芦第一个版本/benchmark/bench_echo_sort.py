@@ -0,0 +1,185 @@
+# benchmark/bench_echo_sort.py
+"""
+声骸整理端到端测速
+使用录制的 3440x1440 详情面板画面回放整理流程，不需要游戏和 Windows 环境
+
+用法（在项目根目录下运行）：
+    python -m benchmark.bench_echo_sort --frames ./bench_frames --count 200
+    python -m benchmark.bench_echo_sort --frames ./bench_frames.zip --compare old.json
+
+录制画面是互相独立的详情面板画面，不是连续滚动的背包，full 模式下翻页只发出滚动、
+不做滚轮校准和对齐检查（见 playback_next_row）
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+from utils.data_loader import DataLoader
+from utils.image_tool import ImageTool
+from utils.input_sink import RecordingInputSink, get_input_sink, set_input_sink
+from utils.metrics import metrics
+from utils.screen_source import PlaybackScreenSource
+from echo_sort.echo_data import handle_echoes, read_echo_info, process_echo
+from echo_sort.rule_table import RuleTable
+
+logger = logging.getLogger(__name__)
+
+# 需要对比的阶段及顺序
+STAGES = ("capture", "inventory_lookup", "ocr_name", "ocr_cost", "set_match", "ocr_main_attr", "ocr_batch",
+          "state_check", "echo")
+
+
+def peak_rss_mb():
+    """进程峰值常驻内存（MB），不支持的平台返回 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def load_rules():
+    """按默认规则生成锁定/弃置规则，与界面初始状态一致"""
+    default_rules = DataLoader().load_default_rules()
+    lock_rules = {}
+    discard_rules = {}
+    for set_name, cost_rules in default_rules.items():
+        lock_rules[set_name] = {cost: rules["lock"] for cost, rules in cost_rules.items()}
+        discard_rules[set_name] = {cost: rules["discard"] for cost, rules in cost_rules.items()}
+    return lock_rules, discard_rules
+
+
+def playback_next_row(image_tool, clicks=-933):
+    """
+    回放时的翻页：只发出滚动（切换到下一帧），录制画面上的格子不连续，无法校准和检查对齐
+    :param image_tool: ImageTool 实例
+    :param clicks: 滚轮值
+    :return: True
+    """
+    get_input_sink().scroll(clicks)
+    return True
+
+
+def run(frames, count, mode, pipelined=False, recognition_only=False):
+    """
+    回放录制画面执行整理流程
+    :param frames: 录制画面目录或 zip 压缩包
+    :param count: 处理的声骸个数
+    :param mode: "echo" 逐个调用 read_echo_info/process_echo；"full" 调用 handle_echoes（翻页见 playback_next_row）
+    :param pipelined: full 模式下是否使用流水线执行
+    :param recognition_only: 是否跳过文字检测，只做批量识别
+    :return: 测速结果 dict
+    """
+    source = PlaybackScreenSource(frames, loop=True)
+    # 每次点击或滚动后切换到下一帧录制画面
+    sink = RecordingInputSink(
+        on_action=lambda action, args: source.advance() if action in ("click", "scroll") else None
+    )
+    set_input_sink(sink)
+
+    image_tool = ImageTool(preload_dir="./image", screen_source=source,
+                           recognition_only=recognition_only)
+    echo_data = DataLoader().load_echo_data()
+    lock_rules, discard_rules = load_rules()
+
+    metrics.reset()
+    ok = True
+    start = time.perf_counter()
+    if mode == "full":
+        ok = handle_echoes(image_tool, echo_data, lock_rules, discard_rules, deal_max=count,
+                           pipelined=pipelined, next_row=playback_next_row)
+    else:
+        rule_table = RuleTable(echo_data, lock_rules, discard_rules, image_tool.attr_lexicon.cost_attrs)
+        for index in range(count):
+            with metrics.stage("echo"):
+                click_position = (375 + index % 10 * 220, 275)
+                echo_info = read_echo_info(image_tool, echo_data, click_position=click_position)
+                if echo_info:
+                    process_echo(image_tool, echo_data, echo_info, lock_rules, discard_rules,
+                                 rule_table=rule_table)
+    elapsed = time.perf_counter() - start
+    set_input_sink(None)
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "frames": os.path.abspath(frames),
+        "frame_count": len(source),
+        "mode": mode,
+        "pipelined": pipelined,
+        "recognition_only": recognition_only,
+        "ok": ok,
+        "echoes": count,
+        "elapsed_s": elapsed,
+        "echoes_per_s": count / elapsed if elapsed else None,
+        "skipped_sleep_s": sink.slept,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": metrics.summary(),
+        "ocr_cache": image_tool.ocr_cache.stats(),
+    }
+
+
+def compare(result, baseline):
+    """
+    打印本次结果与基准结果的差异
+    :param result: 本次测速结果
+    :param baseline: 基准测速结果
+    """
+    print(f"{'阶段':<16}{'基准p50':>10}{'本次p50':>10}{'基准p95':>10}{'本次p95':>10}{'变化':>9}")
+    for stage in STAGES:
+        old = baseline["stages"].get(stage)
+        new = result["stages"].get(stage)
+        if not old or not new:
+            continue
+        change = (new["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100 if old["p50_ms"] else 0.0
+        print(f"{stage:<16}{old['p50_ms']:>10.2f}{new['p50_ms']:>10.2f}"
+              f"{old['p95_ms']:>10.2f}{new['p95_ms']:>10.2f}{change:>8.1f}%")
+    print(f"{'echoes/s':<16}{baseline['echoes_per_s'] or 0:>10.2f}{result['echoes_per_s'] or 0:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="声骸整理端到端测速")
+    parser.add_argument("--frames", required=True, help="录制画面目录或 zip 压缩包")
+    parser.add_argument("--count", type=int, default=100, help="处理的声骸个数")
+    parser.add_argument("--mode", choices=("echo", "full"), default="echo",
+                        help="echo: 逐个读取和处理声骸；full: 调用 handle_echoes（含翻页）")
+    parser.add_argument("--pipelined", action="store_true", help="full 模式下使用流水线执行")
+    parser.add_argument("--recognition-only", action="store_true",
+                        help="固定区域跳过文字检测，只做批量识别")
+    parser.add_argument("--output", help="结果 JSON 路径，默认 benchmark/results/<时间>.json")
+    parser.add_argument("--compare", help="与之对比的基准结果 JSON")
+    parser.add_argument("--trace", help="同时输出 Chrome trace 文件的路径")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    result = run(args.frames, args.count, args.mode, args.pipelined, args.recognition_only)
+
+    output = args.output or os.path.join(
+        "benchmark", "results", time.strftime("%Y%m%d_%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    print(f"处理 {result['echoes']} 个声骸，耗时 {result['elapsed_s']:.2f}s，"
+          f"{result['echoes_per_s']:.2f} 个/秒，峰值内存 {result['peak_rss_mb']} MB")
+    for stage in STAGES:
+        stats = result["stages"].get(stage)
+        if stats:
+            print(f"  {stage:<16}p50 {stats['p50_ms']:.2f}ms  p95 {stats['p95_ms']:.2f}ms  "
+                  f"p99 {stats['p99_ms']:.2f}ms  ({stats['count']} 次)")
+    print(f"结果已保存: {output}")
+    if args.trace:
+        metrics.write_chrome_trace(args.trace)
+        print(f"Chrome trace 已保存: {args.trace}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(result, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,52 +1,105 @@
-import pyautogui
 import time
 import os
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from echo_sort.rule_table import RuleTable, LOCK, DISCARD, KEEP
+from utils.input_sink import get_input_sink
+from utils.grid_scanner import GridScanner, GRID_ROW_REGION, GRID_SECOND_ROW_REGION, GRID_CELL_WIDTH
+from utils.scroll_calibration import scroll_and_wait, vertical_shift, ALIGN_MIN_RESPONSE
+from utils.echo_inventory import panel_hash
+from utils.metrics import metrics
 
 # 配置日志记录器
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def handle_echoes(image_tool, echo_data, lock_rules, discard_rules, deal_max=3000):
+# 声骸详情面板区域 (left, top, right, bottom)，覆盖名称、COST、套装、主词条及锁定/弃置图标
+DETAIL_PANEL_REGION = (2600, 150, 3350, 1000)
+# 详情面板内各识别区域 (left, top, right, bottom)
+NAME_REGION = (2600, 150, 3350, 230)
+COST_REGION = (3135, 265, 3335, 395)
+SET_REGION = (2790, 400, 2850, 460)
+MAIN_ATTR_REGION = (2600, 525, 3340, 1000)
+STATE_REGION = (3070, 400, 3350, 500)
+# 锁定/弃置状态，及对应的状态图标
+LOCKED = "locked"
+DISCARDED = "discarded"
+NEITHER = "neither"
+STATE_ICONS = {
+    LOCKED: "./image/locked_icon.png",
+    DISCARDED: "./image/discarded_icon.png",
+}
+# 选择声骸后判断详情面板是否刷新时 frame_hash 的缩小倍数；副词条只差一个数字时也要能区分
+PANEL_HASH_SCALE = 2
+
+def handle_echoes(image_tool, echo_data, lock_rules, discard_rules, deal_max=3000, pipelined=False, workers=1, max_pending=3,
+                  marker=None, only_new=False, inventory=None, next_row=None):
     """
     处理声骸的主循环
     :param image_tool: ImageTool 实例
     :param echo_data: echo.json 数据
     :param lock_rules: 锁定规则字典
     :param discard_rules: 弃置规则字典
+    :param deal_max: 要处理的声骸个数
+    :param pipelined: 是否流水线执行：主线程负责点击和截屏，识别交给后台线程，与下一个声骸的点击截屏重叠
+    :param workers: 流水线模式下的识别线程数
+    :param max_pending: 流水线模式下最多同时等待识别的声骸数
+    :param marker: SortMarker，上次整理的边界标记，只在 only_new 时需要；首排处理完后更新
+    :param only_new: 只整理新声骸：到达上次整理时的首排位置即结束，之后的声骸不再点选
+    :param inventory: EchoInventory，提供时先按详情面板指纹查库存，命中则跳过 OCR，每排批量写入
+    :param next_row: 翻页函数 next_row(image_tool) -> bool，为 None 时使用 second_echo；
+                     回放测速的画面不是连续的背包画面，可替换为只发出滚动的函数
     :return: (bool) 是否成功处理
     """
+    next_row = next_row or second_echo
     try:
         # 初始化计数器
         deal_sum = 0
         deal_num = 0
 
+        # 开始整理时一次性编译锁定/弃置决策表
+        rule_table = RuleTable(echo_data, lock_rules, discard_rules, image_tool.attr_lexicon.cost_attrs)
+
+        # 每排开始时截取缩略图，查找上次整理的边界
+        scanner = GridScanner(image_tool) if only_new and marker is not None else None
+
+        if pipelined:
+            return _handle_echoes_pipelined(image_tool, echo_data, rule_table, deal_max, workers, max_pending,
+                                            scanner, marker, inventory, next_row)
+
+        row_limit = 10
         while deal_sum < deal_max:
-            # 将从 265*430 开始的 2200*250 范围的区域的图片保存起来
-            image_tool.capture_region((275, 435, 205, 240), "second_echo", folder="./image")
+            if deal_num == 0 and scanner:
+                row_limit = _new_in_row(scanner, marker)
+
+            if deal_num >= row_limit:
+                logger.info(f"已到达上次整理的位置，本次共处理 {deal_sum} 个新声骸")
+                _finish_row(scanner, marker, deal_sum, inventory)
+                return True
 
             # 点击 375*275 位置选择首位声骸，读取屏幕右侧声骸信息
             click_position = (375 + deal_num * 220, 275)
-            echo_info = read_echo_info(image_tool, echo_data, click_position=click_position)
+            echo_info = read_echo_info(image_tool, echo_data, click_position=click_position, inventory=inventory)
             if not echo_info:
                 logger.error("无法读取声骸信息")
                 return False
 
             # 处理声骸
-            result = process_echo(image_tool, echo_data, echo_info, lock_rules, discard_rules)
-            if "声骸名称不在套装对应的COST下" in result:
-                logger.info(f"处理第 {deal_sum} 个声骸: {result}")
-                logger.info(f"声骸详细信息: {echo_info}")
-            else:
-                logger.info(f"处理第 {deal_sum} 个声骸: {result}")
+            result = process_echo(image_tool, echo_data, echo_info, lock_rules, discard_rules, rule_table=rule_table)
+            _log_result(deal_sum, result, echo_info)
+            _record(inventory, echo_info)
 
             # 更新计数器
             deal_sum += 1
             deal_num += 1
 
+            if deal_num >= 10 or deal_sum >= deal_max:
+                _finish_row(scanner, marker, deal_sum, inventory)
+
             if deal_num >= 10:
                 deal_num = 0
-                if not second_echo(image_tool):
+                if not next_row(image_tool):
                     logger.error("滑动过长仍未符合")
                     return False
 
@@ -55,62 +108,174 @@ def handle_echoes(image_tool, echo_data, lock_rules, discard_rules, deal_max=300
         logger.error(f"处理声骸时出错: {str(e)}")
         return False
 
-def read_echo_info(image_tool, echo_data, click_position=(375, 275), attempt=3):
+def _handle_echoes_pipelined(image_tool, echo_data, rule_table, deal_max, workers, max_pending,
+                             scanner=None, marker=None, inventory=None, next_row=None):
+    """
+    流水线模式的主循环
+    主线程按顺序点击、截屏并提交识别任务；识别完成的声骸按原顺序取出决策，
+    需要锁定/弃置时重新点选该声骸再按键。翻页前等待本排全部处理完毕
+    :return: (bool) 是否成功处理
+    """
+    deal_sum = 0
+    deal_num = 0
+    row_limit = 10
+    # 等待识别的声骸 (序号, 点击位置, Future)
+    pending = deque()
+
+    def finish_one():
+        """按顺序取出最早提交的声骸，完成决策和按键"""
+        index, click_position, future = pending.popleft()
+        echo_info = future.result()
+        if not echo_info:
+            # 识别失败时回退为同步读取（含重试）
+            echo_info = read_echo_info(image_tool, echo_data, click_position=click_position, inventory=inventory)
+            if not echo_info:
+                return False
+            selected = True
+        else:
+            selected = False
+
+        decision, result = decide_echo(echo_info, rule_table)
+        if result is None:
+            # 当前选中的已是后面的声骸，按键前重新点选
+            if not selected:
+                _select(image_tool, click_position)
+            result = apply_decision(image_tool, echo_info, decision)
+        _log_result(index, result, echo_info)
+        _record(inventory, echo_info)
+        return True
+
+    def finish_all():
+        """处理完所有已提交的声骸"""
+        while pending:
+            if not finish_one():
+                logger.error("无法读取声骸信息")
+                return False
+        return True
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="echo_ocr") as pool:
+        while deal_sum < deal_max:
+            if deal_num == 0 and scanner:
+                row_limit = _new_in_row(scanner, marker)
+
+            if deal_num >= row_limit:
+                if not finish_all():
+                    return False
+                logger.info(f"已到达上次整理的位置，本次共处理 {deal_sum} 个新声骸")
+                _finish_row(scanner, marker, deal_sum, inventory)
+                return True
+
+            click_position = (375 + deal_num * 220, 275)
+            frame = select_echo(image_tool, click_position)
+            pending.append((deal_sum, click_position, pool.submit(_analyze_or_none, image_tool, echo_data, frame, inventory)))
+
+            # 已识别完成的声骸按顺序处理；等待数达到上限时阻塞等待最早的一个
+            while pending and (pending[0][2].done() or len(pending) >= max_pending):
+                if not finish_one():
+                    logger.error("无法读取声骸信息")
+                    return False
+
+            deal_sum += 1
+            deal_num += 1
+
+            if deal_num >= 10 or deal_sum >= deal_max:
+                # 翻页或结束前处理完本排所有声骸
+                if not finish_all():
+                    return False
+                _finish_row(scanner, marker, deal_sum, inventory)
+
+            if deal_num >= 10 and deal_sum < deal_max:
+                deal_num = 0
+                if not next_row(image_tool):
+                    logger.error("滑动过长仍未符合")
+                    return False
+
+    return True
+
+def _new_in_row(scanner, marker):
+    """
+    截取首排和第二排缩略图，在其中查找上次整理时的首排
+    上次的首排是连续 10 个声骸，起点在本排时会延伸到第二排，因此两排一起查找
+    :param scanner: GridScanner
+    :param marker: SortMarker
+    :return: 本排需要处理的新声骸数 0~10
+    """
+    hashes = scanner.scan_row() + scanner.scan_row(GRID_SECOND_ROW_REGION)
+    position = marker.find(hashes)
+    return 10 if position is None else position
+
+def _finish_row(scanner, marker, deal_sum, inventory):
+    """
+    一排处理完毕（或到达上次整理的位置）：批量写入声骸库存；
+    本次的首排处理完后，记录处理后（含锁定/弃置图标）的首排缩略图作为下次整理的边界
+    """
+    if scanner and deal_sum <= 10:
+        marker.update(scanner.scan_row())
+    if inventory is not None:
+        inventory.flush()
+
+def _record(inventory, echo_info):
+    """将处理后的声骸信息（含最新锁定/弃置状态）暂存到声骸库存"""
+    if inventory is not None and echo_info.get("panel_hash"):
+        inventory.put(echo_info["panel_hash"], echo_info)
+
+def _log_result(index, result, echo_info):
+    """输出单个声骸的处理结果"""
+    logger.info(f"处理第 {index} 个声骸: {result}")
+    if "声骸名称不在套装对应的COST下" in result:
+        logger.info(f"声骸详细信息: {echo_info}")
+
+def _cell_region(click_position):
+    """首排中点击位置所在格子的区域 (left, top, right, bottom)，含选中高亮边框"""
+    left = GRID_ROW_REGION[0] + (click_position[0] - GRID_ROW_REGION[0]) // 220 * 220
+    return (left, GRID_ROW_REGION[1], left + GRID_CELL_WIDTH, GRID_ROW_REGION[3])
+
+def _select(image_tool, click_position, timeout=1.0):
+    """
+    点击选择声骸并等待详情面板刷新
+    相邻两个声骸完全相同时详情面板不变，不能作为点击生效的依据；
+    被点击格子的选中高亮每次点击都会出现，先等它变化，再等详情面板刷新稳定
+    :param image_tool: ImageTool 实例
+    :param click_position: 鼠标点击位置 (x, y)
+    :param timeout: 等待选中高亮出现的超时时间（秒），画面卡顿时也要等到点击生效
+    """
+    cell = _cell_region(click_position)
+    cell_before = image_tool.frame_hash(cell, 4)
+    panel_before = image_tool.frame_hash(DETAIL_PANEL_REGION, PANEL_HASH_SCALE)
+    done = get_input_sink().click(click_position[0], click_position[1])
+    if not image_tool.wait_for_change(cell, cell_before, timeout=timeout, after=done, scale=4):
+        # 格子原本就处于选中状态（如打开背包时默认选中首个声骸）
+        logger.info(f"点击后格子选中状态没有变化: {click_position}")
+    # 高亮与面板在同一帧刷新，面板不变说明两个声骸相同，只需短暂确认
+    image_tool.wait_for_update(DETAIL_PANEL_REGION, panel_before, timeout=0.05,
+                               stable_timeout=0.3, scale=PANEL_HASH_SCALE)
+
+def select_echo(image_tool, click_position):
+    """
+    点击选择声骸并截取详情面板快照
+    :param image_tool: ImageTool 实例
+    :param click_position: 鼠标点击位置 (x, y)
+    :return: 详情面板 ScreenFrame
+    """
+    _select(image_tool, click_position)
+    # 整个详情面板只截屏一次，后续各步骤均使用该快照的切片
+    with metrics.stage("capture"):
+        return image_tool.snapshot(DETAIL_PANEL_REGION)
+
+def read_echo_info(image_tool, echo_data, click_position=(375, 275), attempt=3, inventory=None):
     """
     读取声骸详细信息
     :param image_tool: ImageTool 实例
     :param echo_data: echo.json 数据
     :param click_position: 鼠标点击位置 (x, y)
     :param attempt: 最大尝试次数
+    :param inventory: EchoInventory，提供时先查库存，命中则跳过 OCR
     :return: dict/None 包含声骸信息的字典，失败返回None
     """
     for _ in range(attempt):
         try:
-            # 点击选择声骸
-            pyautogui.click(click_position[0], click_position[1])
-            time.sleep(0.1)
-
-            # 初始化数据容器
-            echo_info = {"count": 1}
-
-            # 1. 读取声骸名称
-            image_tool.capture_region((2600, 150, 750, 80), "name_img", folder="./image/region")
-            name_img_path = "./image/region/name_img.png"
-            echo_info["name"] = image_tool.find_name(name_img_path, echo_data)
-
-            # 2. 读取COST和等级
-            image_tool.capture_region((3135, 265, 200, 130), "cost_img", folder="./image/region")
-            cost_img_path = "./image/region/cost_img.png"
-            cost_text = image_tool._clean_text(image_tool.reader.readtext(cost_img_path, detail=0, paragraph=True))
-            echo_info.update(image_tool._parse_cost_level(cost_text))
-
-            # 3. 识别所属套装
-            echo_info["set"] = image_tool._match_echo_set((2790, 400, 2850, 460))
-
-            # 4. 读取主词条
-            image_tool.capture_region((2600, 525, 740, 475), "main_attr_img", folder="./image/region")
-            main_attr_img_path = "./image/region/main_attr_img.png"
-            echo_info.update(image_tool._parse_attr(image_tool.reader.readtext(main_attr_img_path, detail=0, paragraph=True)))
-
-            # 5. 识别锁定状态
-            lock_icon_path = "./image/locked_icon.png"
-            echo_info["locked"] = image_tool.find_image(
-                lock_icon_path,
-                region=(3070, 400, 3350, 500),
-                confidence=0.9,  # 提高置信度阈值
-                grayscale=True  # 强制灰度匹配
-            ) is not None
-
-            # 6. 识别弃置状态（假设区域相同）
-            discard_icon_path = "./image/discarded_icon.png"
-            echo_info["discarded"] = image_tool.find_image(
-                discard_icon_path,
-                region=(3070, 400, 3350, 500), 
-                confidence=0.9,
-                grayscale=True,
-            ) is not None
-           
-            return echo_info
+            frame = select_echo(image_tool, click_position)
+            return analyze_echo(image_tool, echo_data, frame, inventory)
 
         except Exception as e:
             logger.error(f"读取声骸信息失败（剩余尝试次数{attempt-1}）: {str(e)}")
@@ -120,7 +285,120 @@ def read_echo_info(image_tool, echo_data, click_position=(375, 275), attempt=3):
     logger.error("无法读取声骸信息")
     return None
 
-def process_echo(image_tool, echo_data, echo_info, lock_rules, discard_rules):
+def _analyze_or_none(image_tool, echo_data, frame, inventory=None):
+    """流水线后台任务：识别失败时返回 None，由主线程回退为同步重试"""
+    try:
+        return analyze_echo(image_tool, echo_data, frame, inventory)
+    except Exception as e:
+        logger.error(f"读取声骸信息失败: {str(e)}")
+        return None
+
+def analyze_echo(image_tool, echo_data, frame, inventory=None):
+    """
+    从详情面板快照识别声骸信息，不涉及鼠标键盘操作，可在后台线程执行
+    :param image_tool: ImageTool 实例
+    :param echo_data: echo.json 数据
+    :param frame: 详情面板 ScreenFrame
+    :param inventory: EchoInventory，提供时先按详情面板指纹查库存，命中则跳过文字识别
+    :return: dict 包含声骸信息的字典
+    """
+    # 初始化数据容器
+    echo_info = {"count": 1}
+
+    # 锁定/弃置图标不参与指纹，状态每次都从画面重新识别
+    cached = None
+    if inventory is not None:
+        with metrics.stage("inventory_lookup"):
+            key = panel_hash(frame, exclude=STATE_REGION)
+            cached = inventory.get(key)
+        echo_info["panel_hash"] = key
+
+    if cached:
+        echo_info.update({k: v for k, v in cached.items() if k not in ("locked", "discarded")})
+    elif image_tool.recognition_only:
+        with metrics.stage("ocr_cost"):
+            echo_info.update(image_tool.read_cost_level(frame.crop(COST_REGION)))
+        # 文字区域位置固定：跳过文字检测，名称和主词条的文本行一次批量识别
+        with metrics.stage("ocr_batch"):
+            texts = image_tool.read_regions(frame, {
+                "name": NAME_REGION,
+                "main_attr": MAIN_ATTR_REGION,
+            })
+        with metrics.stage("set_match"):
+            echo_info["set"] = image_tool._match_echo_set(SET_REGION, frame=frame)
+        echo_info["name"] = image_tool.resolve_name(
+            image_tool._clean_text(texts["name"]), echo_data,
+            echo_set=echo_info["set"],
+            cost=echo_info["cost"]
+        )
+        echo_info.update(image_tool._parse_attr(texts["main_attr"]))
+    else:
+        _read_text_regions(image_tool, echo_data, frame, echo_info)
+
+    # 5. 识别锁定/弃置状态（两个图标在同一区域，一次预处理同时匹配）
+    with metrics.stage("state_check"):
+        state = probe_state(image_tool, frame=frame)
+        echo_info["locked"] = state == LOCKED
+        echo_info["discarded"] = state == DISCARDED
+
+    return echo_info
+
+def probe_state(image_tool, frame=None, confidence=0.9):
+    """
+    识别声骸的锁定/弃置状态
+    :param image_tool: ImageTool 实例
+    :param frame: 详情面板 ScreenFrame，为 None 时重新截取状态区域
+    :param confidence: 匹配置信度阈值
+    :return: LOCKED / DISCARDED / NEITHER
+    """
+    states = list(STATE_ICONS)
+    scores = image_tool.match_templates([STATE_ICONS[state] for state in states], STATE_REGION, frame=frame)
+    best = max(range(len(states)), key=lambda index: scores[index])
+    logger.info(f"状态图标匹配值: {dict(zip(states, scores))}")
+    return states[best] if scores[best] >= confidence else NEITHER
+
+def has_state(image_tool, state, confidence=0.9):
+    """
+    按键后验证声骸是否已处于指定状态：只看该状态图标自身的匹配值，
+    不与另一个图标比较，另一个图标的弱匹配不会让验证通过
+    :param image_tool: ImageTool 实例
+    :param state: LOCKED 或 DISCARDED
+    :param confidence: 匹配置信度阈值
+    :return: (bool)
+    """
+    score = image_tool.match_templates([STATE_ICONS[state]], STATE_REGION)[0]
+    logger.info(f"{state} 图标匹配值: {score}")
+    return score >= confidence
+
+def _read_text_regions(image_tool, echo_data, frame, echo_info):
+    """逐区域检测并识别 COST、套装、名称和主词条，结果写入 echo_info"""
+    # 1. 读取COST和等级（3135*265 开始的 200*130 区域）
+    with metrics.stage("ocr_cost"):
+        cost_img = frame.crop(COST_REGION)
+        image_tool.dump_region(cost_img, "cost_img")
+        echo_info.update(image_tool.read_cost_level(cost_img))
+
+    # 2. 识别所属套装
+    with metrics.stage("set_match"):
+        echo_info["set"] = image_tool._match_echo_set(SET_REGION, frame=frame)
+
+    # 3. 读取声骸名称（2600*150 开始的 750*80 区域），按已识别的套装和COST纠错
+    with metrics.stage("ocr_name"):
+        name_img = frame.crop(NAME_REGION)
+        image_tool.dump_region(name_img, "name_img")
+        echo_info["name"] = image_tool.find_name(
+            name_img, echo_data,
+            echo_set=echo_info["set"],
+            cost=echo_info["cost"]
+        )
+
+    # 4. 读取主词条（2600*525 开始的 740*475 区域）
+    with metrics.stage("ocr_main_attr"):
+        main_attr_img = frame.crop(MAIN_ATTR_REGION)
+        image_tool.dump_region(main_attr_img, "main_attr_img")
+        echo_info.update(image_tool._parse_attr(image_tool.read_text(main_attr_img)))
+
+def process_echo(image_tool, echo_data, echo_info, lock_rules, discard_rules, rule_table=None):
     """
     处理声骸信息，判断是否锁定或弃置
     :param image_tool: ImageTool 实例
@@ -128,96 +406,137 @@ def process_echo(image_tool, echo_data, echo_info, lock_rules, discard_rules):
     :param echo_info: 声骸信息字典
     :param lock_rules: 锁定规则字典
     :param discard_rules: 弃置规则字典
+    :param rule_table: 预编译的 RuleTable，为 None 时临时编译（仅适合单次调用）
     :return: (str) 处理结果信息
     """
     try:
-        # 判断声骸所属套装
-        echo_set = echo_info.get("set")
-        if not echo_set:
-            return "无法识别声骸套装"
-
-        # 处理 echo_set 可能是图片文件名的情况
-        echo_set = os.path.splitext(echo_set)[0]  # 去掉文件扩展名
-
-        # 查找 echo_set 对应的套装名称
-        echo_set_name = None
-        for set_name, set_data in echo_data.items():
-            if set_data["num"] == echo_set:
-                echo_set_name = set_name
-                break
+        if rule_table is None:
+            rule_table = RuleTable(echo_data, lock_rules, discard_rules, image_tool.attr_lexicon.cost_attrs)
 
-        if not echo_set_name:
-            return f"无法识别声骸套装: {echo_set}"
-
-        # 判断声骸名称是否在该套装对应的cost下
-        echo_name = echo_info.get("name")
-        echo_cost = echo_info.get("cost")
-        if echo_cost == 1:
-            cost_key = "cost1"
-        elif echo_cost == 3:
-            cost_key = "cost3"
-        elif echo_cost == 4:
-            cost_key = "cost4"
-        else:
-            return f"未知的声骸COST: {echo_cost}"
+        decision, result = decide_echo(echo_info, rule_table)
+        if result is not None:
+            return result
+        return apply_decision(image_tool, echo_info, decision)
+
+    except Exception as e:
+        return f"处理声骸信息时出错: {str(e)}"
+
+def decide_echo(echo_info, rule_table):
+    """
+    根据决策表判断声骸是否需要锁定或弃置，不涉及鼠标键盘操作
+    :param echo_info: 声骸信息字典
+    :param rule_table: 预编译的 RuleTable
+    :return: (决策, 结果信息)，结果信息为 None 表示需要调用 apply_decision 按键
+    """
+    # 判断声骸所属套装
+    echo_set = echo_info.get("set")
+    if not echo_set:
+        return KEEP, "无法识别声骸套装"
+
+    # 处理 echo_set 可能是图片文件名的情况
+    echo_set = os.path.splitext(echo_set)[0]  # 去掉文件扩展名
+
+    # 查决策表，一次字典查找得到锁定/弃置/不操作
+    echo_name = echo_info.get("name")
+    decision = rule_table.lookup(echo_set, echo_info.get("cost"), echo_name, echo_info.get("attr1"))
+    if decision is None:
+        error = rule_table.explain(echo_set, echo_info.get("cost"), echo_name)
+        if error:
+            return KEEP, error
+        decision = KEEP
 
-        if echo_name not in echo_data[echo_set_name].get(cost_key, []):
-            return f"声骸名称不在套装对应的COST下: {echo_name}"
+    # 根据锁定和弃置规则判断
+    if decision == LOCK:
+        # 检查是否已锁定
+        if echo_info.get("locked"):
+            return decision, f"声骸已锁定: {echo_name}"
+        return decision, None
+    elif decision == DISCARD:
+        # 检查是否已弃置
+        if echo_info.get("discarded"):
+            return decision, f"声骸已弃置: {echo_name}"
+        return decision, None
+    return decision, f"声骸不符合锁定或弃置规则: {echo_name}"
 
-        # 根据锁定和弃置规则判断
-        attr1 = echo_info.get("attr1")
-        if attr1 in lock_rules[echo_set_name].get(cost_key, []):
-            # 检查是否已锁定
-            if echo_info.get("locked"):
+def apply_decision(image_tool, echo_info, decision):
+    """
+    对当前选中的声骸按键锁定或弃置，并验证结果
+    :param image_tool: ImageTool 实例
+    :param echo_info: 声骸信息字典
+    :param decision: LOCK 或 DISCARD
+    :return: (str) 处理结果信息
+    """
+    echo_name = echo_info.get("name")
+    try:
+        if decision == LOCK:
+            # 执行锁定操作
+            before = image_tool.frame_hash(STATE_REGION)
+            done = get_input_sink().press('c')
+            image_tool.wait_for_update(STATE_REGION, before, timeout=0.3, after=done)
+            if has_state(image_tool, LOCKED):
+                echo_info["locked"] = True
                 return f"声骸已锁定: {echo_name}"
             else:
-                # 执行锁定操作
-                pyautogui.press('c')
-                time.sleep(0.01)
-                if image_tool.find_image("./image/locked_icon.png", region=(3070, 400, 3350, 500), confidence=0.9):
-                    return f"声骸已锁定: {echo_name}"
-                else:
-                    return f"声骸锁定失败: {echo_name}"
-        elif attr1 in discard_rules[echo_set_name].get(cost_key, []):
-            # 检查是否已弃置
-            if echo_info.get("discarded"):
+                return f"声骸锁定失败: {echo_name}"
+        elif decision == DISCARD:
+            # 执行弃置操作
+            before = image_tool.frame_hash(STATE_REGION)
+            done = get_input_sink().press('z')
+            image_tool.wait_for_update(STATE_REGION, before, timeout=0.3, after=done)
+            if has_state(image_tool, DISCARDED):
+                echo_info["discarded"] = True
                 return f"声骸已弃置: {echo_name}"
             else:
-                # 执行弃置操作
-                pyautogui.press('z')
-                time.sleep(0.01)
-                if image_tool.find_image("./image/discarded_icon.png", region=(3070, 400, 3350, 500), confidence=0.9):
-                    return f"声骸已弃置: {echo_name}"
-                else:
-                    return f"声骸弃置失败: {echo_name}"
-        else:
-            return f"声骸不符合锁定或弃置规则: {echo_name}"
+                return f"声骸弃置失败: {echo_name}"
+        return f"声骸不符合锁定或弃置规则: {echo_name}"
 
     except Exception as e:
         return f"处理声骸信息时出错: {str(e)}"
 
-def second_echo(image_tool):
-    """操控鼠标滑动滚轮，直到指定区域与 second_echo 图片完全符合"""
+def second_echo(image_tool, max_corrections=2, tolerance=4):
+    """
+    翻到下一排：按校准的滚轮值滑动一排，再用相位相关检查原第二排是否已移到首排位置，有偏差时微调
+    :param image_tool: ImageTool 实例
+    :param max_corrections: 最多微调次数
+    :param tolerance: 允许的残余位移（像素）
+    :return: (bool) 是否已对齐到下一排
+    """
     try:
-        max_attempts = 1  # 最大尝试次数
-        attempts = 0
-
-        while attempts < max_attempts:
-            # 滑动滚轮
-            pyautogui.scroll(-933)  # 向下滑动滚轮，值越大滑动越多
-            # 截取当前区域图片
-            time.sleep(0.5)
-            logger.info(f"第{attempts+1}次滑动")
-            # 比较当前区域图片与 second_echo 图片
-            if image_tool.find_image("./image/second_echo.png", region=(265, 155, 480, 405), confidence=0.6):
-                return True
+        calibration = image_tool.scroll_calibration
+        screen_size = image_tool.screen_size()
+        # 当前分辨率首次翻页时先校准；本次运行中已校准失败时不再重试，直接用默认滚轮值
+        if calibration.needs_calibration(screen_size):
+            calibration.calibrate(image_tool)
 
-            attempts += 1
+        # 原首排和原第二排，翻页后首排位置应与原第二排吻合、与原首排不同
+        first = image_tool.grab(GRID_ROW_REGION).copy()
+        target = image_tool.grab(GRID_SECOND_ROW_REGION).copy()
+        if not scroll_and_wait(image_tool, calibration.row_scroll(screen_size)):
+            # 已到背包末尾或滚轮未生效
+            logger.error("滑动后画面没有变化，可能已到背包末尾")
+            return False
 
-        logger.error("滑动过长仍未符合")
+        for attempt in range(max_corrections + 1):
+            current = image_tool.grab(GRID_ROW_REGION)
+            offset, response = vertical_shift(target, current)
+            # 各排格子边框相同，画面没动时与原第二排也能得到接近 0 的位移，须同时确认比原首排更吻合
+            _, stale = vertical_shift(first, current)
+            if response < ALIGN_MIN_RESPONSE or response <= stale:
+                logger.error(f"翻页后首排与原第二排对不上，相关峰值 {response:.2f}（与原首排 {stale:.2f}）")
+                return False
+            if abs(offset) <= tolerance:
+                return True
+            if attempt == max_corrections:
+                break
+            clicks = calibration.correction(screen_size, offset)
+            logger.info(f"翻页偏差 {offset:.1f} 像素，第{attempt+1}次微调滚轮 {clicks}")
+            if not scroll_and_wait(image_tool, clicks):
+                logger.error("微调滚轮后画面没有变化，可能已到背包末尾")
+                return False
+
+        logger.error(f"微调 {max_corrections} 次后仍未对齐，残余偏差 {offset:.1f} 像素")
         return False
 
     except Exception as e:
         logger.error(f"滑动过程中发生错误: {str(e)}")
         return False
-
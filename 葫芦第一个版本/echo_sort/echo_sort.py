@@ -6,6 +6,10 @@ from PyQt5.QtWidgets import QMessageBox
 from utils.image_tool import ImageTool
 from echo_sort.open_backpack import open_backpack, switch_to_echo_tab, adjust_sort_order
 from echo_sort.echo_data import read_echo_info, process_echo, second_echo, handle_echoes
+from utils.metrics import metrics
+from utils.ocr_engine import get_ocr_engine
+from utils.grid_scanner import SortMarker
+from utils.echo_inventory import EchoInventory
 
 # 初始化 logger
 logger = logging.getLogger(__name__)
@@ -18,14 +22,22 @@ class EchoSorter:
         self.running = False
         # 用于更新 UI 状态的回调函数
         self.ui_callback = ui_callback  
+        # 是否流水线执行：识别与下一个声骸的点击截屏重叠，由界面“流水线识别”选项设置
+        self.pipelined = False
+        # 是否只整理新声骸：跳过以往运行中已处理过的声骸
+        self.only_new = False
 
     def start_sorting(self, lock_rules, discard_rules):
         """完整的整理流程"""
+        inventory = None
         try:
             # 标记整理流程开始运行
             self.running = True
             logger.info("== 开始整理流程 ==")
 
+            # 0. 加载并预热 OCR 模型（已加载时立即返回），避免计入第一个声骸的耗时
+            get_ocr_engine().load()
+
             # 1. 激活游戏窗口
             if not self.gc.activate_game_window():
                 self._show_error("无法连接到游戏窗口，请确保游戏已启动")
@@ -54,8 +66,13 @@ class EchoSorter:
                 self._show_error("无法设置时间排序，请手动调整")
                 return False
 
-            # 6. 处理声骸
-            if not handle_echoes(self.gc.image_tool, self.gc.echo_data, lock_rules, discard_rules):
+            # 6. 处理声骸（识别结果保存到声骸库存，再次遇到同一声骸时跳过 OCR）
+            inventory = EchoInventory()
+            # 整理边界标记只在只整理新声骸时使用，其它情况不截取缩略图
+            marker = SortMarker() if self.only_new else None
+            if not handle_echoes(self.gc.image_tool, self.gc.echo_data, lock_rules, discard_rules,
+                                 pipelined=self.pipelined, marker=marker, only_new=self.only_new,
+                                 inventory=inventory):
                 self._show_error("处理声骸时出错")
                 return False
 
@@ -63,6 +80,14 @@ class EchoSorter:
         except Exception as e:
             self._show_error(f"运行时错误: {str(e)}")
             return False
+        finally:
+            if inventory is not None:
+                inventory.close()
+            stats = self.gc.image_tool.ocr_cache.stats()
+            logger.info(f"OCR 缓存命中 {stats['hits']} 次，未命中 {stats['misses']} 次，命中率 {stats['hit_rate']:.1%}")
+            # 输出本次运行的耗时统计和 Chrome trace
+            metrics.flush()
+            metrics.reset()
 
     def pause_sorting(self):
         """暂停整理"""
@@ -1,6 +1,5 @@
-import pyautogui
-import time
 import logging
+from utils.input_sink import get_input_sink
 
 # 初始化 logger
 logger = logging.getLogger(__name__)
@@ -10,7 +9,7 @@ def open_backpack(image_tool, retry=3, interval=1.5):
     打开背包并验证是否成功
     :param image_tool: ImageTool 实例
     :param retry: 最大重试次数
-    :param interval: 重试间隔(秒)
+    :param interval: 重试前等待画面稳定的最长时间(秒)
     :return: (bool) 是否成功打开
     """
     close_btn_img = "./image/backpack_close.png"  # 需准备的关闭按钮图片
@@ -19,8 +18,9 @@ def open_backpack(image_tool, retry=3, interval=1.5):
         logger.info(f"尝试打开背包 ({attempt}/{retry})...")
         
         # 按下B键打开背包
-        pyautogui.press('b')
-        time.sleep(0.5)  # 等待界面响应
+        before = image_tool.frame_hash()
+        done = get_input_sink().press('b')
+        image_tool.wait_for_update(reference=before, timeout=1.0, after=done)  # 等待界面响应
         
         # 识别关闭按钮
         if image_tool.find_image(close_btn_img, confidence=0.85):
@@ -28,7 +28,7 @@ def open_backpack(image_tool, retry=3, interval=1.5):
             return True
             
         logger.warning("未检测到背包界面")
-        time.sleep(interval)
+        image_tool.wait_for_stable(timeout=interval)
     
     logger.error(f"无法打开背包，已重试{retry}次")
     return False
@@ -58,9 +58,10 @@ def switch_to_echo_tab(image_tool, retry=3):
             continue
             
         # 精确点击标签页中心位置
-        pyautogui.moveTo(tab_pos[0], tab_pos[1], duration=0.3)
-        pyautogui.click()
-        time.sleep(0.5)  # 等待界面切换
+        before = image_tool.frame_hash()
+        get_input_sink().move_to(tab_pos[0], tab_pos[1])
+        done = get_input_sink().click()
+        image_tool.wait_for_update(reference=before, timeout=1.0, after=done)  # 等待界面切换
         
         # 验证是否切换成功
         if image_tool.find_image(filter_icon, confidence=0.8):
@@ -96,9 +97,10 @@ def adjust_sort_order(image_tool, max_attempts=3):
             logger.warning("未找到排序按钮")
             continue
             
-        pyautogui.moveTo(sort_btn[0], sort_btn[1], duration=0.3)
-        pyautogui.click()
-        time.sleep(0.5)  # 等待菜单展开
+        before = image_tool.frame_hash()
+        get_input_sink().move_to(sort_btn[0], sort_btn[1])
+        done = get_input_sink().click()
+        image_tool.wait_for_update(reference=before, timeout=1.0, after=done)  # 等待菜单展开
 
         # 步骤5b：验证排序列表是否打开
         if not image_tool.find_image(sort_list_icon, confidence=0.8):
@@ -111,9 +113,10 @@ def adjust_sort_order(image_tool, max_attempts=3):
             logger.warning("未找到时间排序选项")
             continue
             
-        pyautogui.moveTo(time_option[0], time_option[1], duration=0.3)
-        pyautogui.click()
-        time.sleep(0.2)  # 等待列表关闭
+        before = image_tool.frame_hash()
+        get_input_sink().move_to(time_option[0], time_option[1])
+        done = get_input_sink().click()
+        image_tool.wait_for_update(reference=before, timeout=1.0, after=done)  # 等待列表关闭
 
         # 步骤6b：验证排序结果
         if image_tool.find_image(time_sort_icon, confidence=0.85):
@@ -0,0 +1,82 @@
+# echo_sort/rule_table.py
+import logging
+
+# 初始化 logger
+logger = logging.getLogger(__name__)
+
+# 决策结果：锁定、弃置、不操作
+LOCK = "lock"
+DISCARD = "discard"
+KEEP = "keep"
+
+# 支持的 COST
+COSTS = (1, 3, 4)
+
+
+class RuleTable:
+    """
+    锁定/弃置决策表
+    开始整理时将界面设置的锁定、弃置规则与 echo.json 编译为一张扁平哈希表，
+    键为 (套装编号, COST, 声骸名, 主词条)，每个声骸的决策只需一次字典查找
+    """
+    def __init__(self, echo_data, lock_rules, discard_rules, cost_attrs=None):
+        """
+        :param echo_data: echo.json 数据
+        :param lock_rules: 锁定规则字典 {套装名: {"cost1": [...], ...}}
+        :param discard_rules: 弃置规则字典，结构同锁定规则
+        :param cost_attrs: 各 COST 可选主词条 {"cost1": [...], ...}，用于预填“不操作”项
+        """
+        self.set_names = {}   # 套装编号 -> 套装名
+        self._valid = {}      # 套装编号 -> {COST: 该 COST 下的声骸名集合}
+        self._table = {}      # (套装编号, COST, 声骸名, 主词条) -> 决策
+
+        for set_name, set_data in echo_data.items():
+            set_num = set_data["num"]
+            self.set_names[set_num] = set_name
+            self._valid[set_num] = {}
+            for cost in COSTS:
+                cost_key = f"cost{cost}"
+                names = frozenset(set_data.get(cost_key, []))
+                self._valid[set_num][cost] = names
+
+                # 锁定优先于弃置，其余主词条为不操作
+                decisions = {}
+                for attr in lock_rules.get(set_name, {}).get(cost_key, []):
+                    decisions.setdefault(attr, LOCK)
+                for attr in discard_rules.get(set_name, {}).get(cost_key, []):
+                    decisions.setdefault(attr, DISCARD)
+                for attr in (cost_attrs or {}).get(cost_key, ()):
+                    decisions.setdefault(attr, KEEP)
+
+                for name in names:
+                    for attr, decision in decisions.items():
+                        self._table[(set_num, cost, name, attr)] = decision
+
+        logger.info(f"决策表编译完成，共 {len(self._table)} 项")
+
+    def lookup(self, echo_set, cost, name, attr1):
+        """
+        查询决策
+        :param echo_set: 套装编号（如 "001"）
+        :param cost: COST
+        :param name: 声骸名
+        :param attr1: 主词条
+        :return: LOCK / DISCARD / KEEP，表中没有该项时返回 None
+        """
+        return self._table.get((echo_set, cost, name, attr1))
+
+    def explain(self, echo_set, cost, name):
+        """
+        查表未命中时给出原因
+        :param echo_set: 套装编号
+        :param cost: COST
+        :param name: 声骸名
+        :return: 错误信息，声骸本身合法（只是主词条不在规则内）时返回 None
+        """
+        if echo_set not in self._valid:
+            return f"无法识别声骸套装: {echo_set}"
+        if cost not in COSTS:
+            return f"未知的声骸COST: {cost}"
+        if name not in self._valid[echo_set][cost]:
+            return f"声骸名称不在套装对应的COST下: {name}"
+        return None
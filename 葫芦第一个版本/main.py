@@ -1,7 +1,8 @@
 import sys
 from PyQt5.QtWidgets import QApplication
-from ui.main_window import MainWindow
+from PyQt5.QtCore import QTimer
 from config.logger_config import setup_logger
+from utils.startup_report import startup_report
 
 def load_styles():
     try:
@@ -14,6 +15,10 @@ def main():
     # 初始化日志系统
     logger = setup_logger()
     logger.info("====== 应用程序启动 ======")
+    # --startup-report: 输出各启动阶段及模块导入耗时（类似 python -X importtime）
+    if "--startup-report" in sys.argv:
+        sys.argv.remove("--startup-report")
+        startup_report.install()
     app = QApplication(sys.argv)
     app.setStyle('Fusion')  # 使用Fusion样式
     
@@ -22,10 +27,15 @@ def main():
     if style:
         app.setStyleSheet(style)
     
+    # 界面模块不导入识别相关的重量级模块，识别模型在窗口显示后由后台线程加载
+    from ui.main_window import MainWindow
+    startup_report.mark("界面模块导入完成")
     window = MainWindow()
     window.setWindowTitle("葫芦 - 鸣潮工具集")
     window.setMinimumSize(800, 600)
     window.show()
+    # 事件循环处理完首次绘制后记录窗口显示时间
+    QTimer.singleShot(0, lambda: startup_report.mark("窗口显示"))
     sys.exit(app.exec_())
 
 if __name__ == "__main__":  
@@ -1,6 +1,5 @@
 import tkinter as tk
 from tkinter import messagebox
-import pyautogui
 import time
 import win32gui
 import win32con
@@ -54,7 +53,7 @@ def activate_game_window(retry=3, delay=2):
 
 def run_test():
     try:
-        scroll_value = int(entry.get())
+        row_count = int(entry.get())
 
         # 2. 点击开始测试后，跳转到游戏窗口
         if not activate_game_window():
@@ -63,55 +62,33 @@ def run_test():
 
         image_tool = ImageTool()
 
-        # 3. 截取第二排的图片作为second_echo中的对比图片
-        image_tool.capture_region((275, 435, 205, 240), "second_echo", folder="./image")
-
-        def modified_second_echo(image_tool):
-            try:
-                max_attempts = 120  # 最大尝试次数
-                attempts = 0
-            
-                scroll_value2 = 0 - scroll_value
-
-                while attempts < max_attempts:
-                    # 滑动滚轮
-                    print(f"滑动值: {scroll_value2}")
-                    pyautogui.scroll(scroll_value2)  # 使用测试的滑动值
-                    # 截取当前区域图片
-                    print(f"第{attempts + 1}次滑动")
-                    time.sleep(2)
-                    # 比较当前区域图片与 second_echo 图片
-                    if image_tool.find_image("./image/second_echo.png", region=(265, 155, 480, 405), confidence=0.6):
-                        return False
-
-                    attempts += 1
-
-                print("滑动过长仍未符合")
-                return False
-
-            except Exception as e:
-                print(f"滑动过程中发生错误: {str(e)}")
-                return False
-
-        # 4. 开始调用second_echo方法直接往下滑动滚轮，重复20次
+        # 3. 重新校准滚轮，得到当前分辨率下翻一排的滚轮值
+        calibration = image_tool.scroll_calibration
+        screen_size = image_tool.screen_size()
+        if calibration.calibrate(image_tool) is None:
+            messagebox.showerror("错误", "滚轮校准失败，请确认背包已打开且声骸不少于两排")
+            return
+        row_scroll = calibration.row_scroll(screen_size)
+        print(f"翻一排滚轮值: {row_scroll}")
+
+        # 4. 调用 second_echo 连续翻页，统计对齐成功的次数
         success_count = 0
-        for i in range(1):
+        for i in range(row_count):
             print(f"第 {i + 1} 轮测试")
-            result = modified_second_echo(image_tool)
-            if result:
+            if second_echo(image_tool):
                 success_count += 1
 
-        messagebox.showinfo("测试结果", f"滑动值 {scroll_value} 的测试中，20 次尝试成功 {success_count} 次。")
+        messagebox.showinfo("测试结果", f"翻一排滚轮值 {row_scroll}，{row_count} 次翻页中对齐成功 {success_count} 次。")
     except ValueError:
         messagebox.showerror("输入错误", "请输入一个有效的整数。")
 
 
 # 创建主窗口
 root = tk.Tk()
-root.title("滑动值测试")
+root.title("滚轮校准测试")
 
 # 创建标签和输入框
-label = tk.Label(root, text="请输入滑动值:")
+label = tk.Label(root, text="请输入翻页次数:")
 label.pack(pady=10)
 
 entry = tk.Entry(root)
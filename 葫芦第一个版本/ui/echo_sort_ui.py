@@ -3,12 +3,13 @@
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, 
     QListWidget, QPushButton, QDialog, QCheckBox,
-    QScrollArea, QLabel, QListWidgetItem, QAbstractItemView, QMessageBox
+    QScrollArea, QLabel, QListWidgetItem, QAbstractItemView, QMessageBox,
+    QProgressBar
 )
 # 导入 PyQt5 的核心模块中的类
 from PyQt5.QtCore import Qt, QEvent, QTimer
-# 从 utils.game_controller 模块导入 GameController 类
-from utils.game_controller import GameController
+# 后台加载识别模块和 OCR 模型的线程
+from ui.model_loader import ModelLoader
 
 class EchoSortWidget(QWidget):
     def __init__(self):
@@ -19,8 +20,8 @@ class EchoSortWidget(QWidget):
         2. 初始化存储所有词条、锁定规则和弃置规则的字典。
         3. 初始化用户界面。
         4. 加载数据并初始化默认规则。
-        5. 创建 GameController 实例。
-        6. 初始化 EchoSorter 实例，并传入 UI 状态更新回调函数。
+        5. 在后台线程中加载识别模块和 OCR 模型，完成后创建 EchoSorter 实例。
+        6. EchoSorter 加载完成前禁用开始整理按钮。
         7. 安装事件过滤器以处理按键事件。
         8. 初始化 Esc 键计数器和计时器。
         """
@@ -36,13 +37,10 @@ class EchoSortWidget(QWidget):
         self.init_ui()
         # 加载数据并初始化默认规则
         self.load_data()
-        # 创建 GameController 实例，用于控制游戏相关操作
-        self.game_controller = GameController()
-
-        # 从 echo_sort.echo_sort 模块导入 EchoSorter 类
-        from echo_sort.echo_sort import EchoSorter
-        # 初始化 EchoSorter 实例，并传入 UI 状态更新回调函数
-        self.sorter = EchoSorter(self.update_ui_status)
+        # EchoSorter 依赖 cv2/torch/easyocr，导入和加载模型较慢，放到后台线程，窗口先显示
+        self.sorter = None
+        self.model_loader = None
+        self.load_models()
 
         # 安装事件过滤器，用于处理按键事件
         self.installEventFilter(self)
@@ -82,12 +80,58 @@ class EchoSortWidget(QWidget):
         # 停止计时器
         self.esc_timer.stop()
 
+    def load_models(self):
+        """
+        启动后台线程加载识别模块和 OCR 模型，加载期间显示进度并禁用开始整理按钮。
+        """
+        self.btn_start.setEnabled(False)
+        self.load_progress.show()
+        self.model_loader = ModelLoader(self.update_ui_status, self)
+        self.model_loader.progress.connect(self.on_load_progress)
+        self.model_loader.loaded.connect(self.on_models_loaded)
+        self.model_loader.failed.connect(self.on_load_failed)
+        self.model_loader.start()
+
+    def on_load_progress(self, done, total, step):
+        """
+        更新模型加载进度。
+        :param done: 已完成步骤数
+        :param total: 总步骤数
+        :param step: 当前步骤说明
+        """
+        self.load_progress.setMaximum(total)
+        self.load_progress.setValue(done)
+        self.load_progress.setFormat(f"{step} (%v/%m)")
+        self.update_ui_status("loading")
+
+    def on_models_loaded(self, sorter):
+        """
+        模型加载完成，保存 EchoSorter 实例并启用开始整理按钮。
+        :param sorter: 后台线程创建的 EchoSorter 实例
+        """
+        self.sorter = sorter
+        self.load_progress.hide()
+        self.btn_start.setEnabled(True)
+        self.update_ui_status("ready")
+
+    def on_load_failed(self, msg):
+        """
+        模型加载失败，显示错误信息；再次点击开始整理时重新加载。
+        :param msg: 错误信息
+        """
+        self.load_progress.hide()
+        self.btn_start.setEnabled(True)
+        self.update_ui_status("error", f"加载识别模型失败: {msg}")
+
     def pause_sorting(self):
         """
         暂停整理操作，并更新 UI 状态为已暂停。
         调用 EchoSorter 实例的 pause_sorting 方法暂停整理，
         并调用 update_ui_status 方法更新 UI 状态。
         """
+        # 模型尚未加载完成时没有可暂停的整理流程
+        if self.sorter is None:
+            return
         # 调用 EchoSorter 实例的 pause_sorting 方法暂停整理
         self.sorter.pause_sorting()
         # 调用 update_ui_status 方法更新 UI 状态为已暂停
@@ -160,9 +204,22 @@ class EchoSortWidget(QWidget):
         
         # 在布局中插入状态标签
         self.right_layout.insertWidget(1, self.status_label)
+
+        # 创建模型加载进度条，加载完成后隐藏
+        self.load_progress = QProgressBar()
+        self.load_progress.setTextVisible(True)
+        self.right_layout.addWidget(self.load_progress)
         
+        # 创建“只整理新声骸”选项，勾选后跳过以往已处理过的声骸
+        self.only_new_checkbox = QCheckBox("只整理新声骸")
+        self.right_layout.addWidget(self.only_new_checkbox)
+
+        # 创建“流水线识别”选项，勾选后识别当前声骸的同时点击下一个声骸
+        self.pipelined_checkbox = QCheckBox("流水线识别")
+        self.right_layout.addWidget(self.pipelined_checkbox)
+
         # 创建开始整理按钮
-        btn_start = QPushButton("开始整理")
+        self.btn_start = btn_start = QPushButton("开始整理")
         # 设置按钮的固定高度
         btn_start.setFixedHeight(45)
         # 设置按钮的样式
@@ -374,6 +431,8 @@ class EchoSortWidget(QWidget):
         """
         # 定义状态映射字典，包含不同状态对应的文本和颜色
         status_map = {
+            "loading": ("正在加载识别模型...", "#666"),
+            "ready": ("准备就绪", "#666"),
             "running": ("运行中...", "#2196F3"),
             "success": ("整理完成", "#4CAF50"),
             "error": (f"错误: {msg}", "#F44336"),
@@ -498,6 +557,14 @@ class EchoSortWidget(QWidget):
         开始整理按钮点击事件处理函数，调用 EchoSorter 的 start_sorting 方法开始整理。
         如果在整理过程中发生错误，会弹出错误消息框。
         """
+        # 模型尚未加载（或上次加载失败）时先加载，完成后再点击开始
+        if self.sorter is None:
+            if self.model_loader is None or not self.model_loader.isRunning():
+                self.load_models()
+            return
+        # 同步“只整理新声骸”“流水线识别”选项
+        self.sorter.only_new = self.only_new_checkbox.isChecked()
+        self.sorter.pipelined = self.pipelined_checkbox.isChecked()
         try:
             # 调用 EchoSorter 实例的 start_sorting 方法开始整理
             self.sorter.start_sorting(self.selected_lock_rules, self.selected_discard_rules)
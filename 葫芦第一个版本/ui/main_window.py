@@ -16,24 +16,6 @@ class MainWindow(QMainWindow):
         self.init_ui()
         # 初始化各个功能模块
         self.init_modules()
-        
-        # 创建主界面的中心部件
-        self.central_widget = QWidget()
-        # 将中心部件设置为当前窗口的中心部件
-        self.setCentralWidget(self.central_widget)
-        # 创建一个垂直布局用于管理中心部件内的子部件
-        self.main_layout = QVBoxLayout(self.central_widget)
-        
-        # 创建顶部的功能选择按钮区域
-        self.create_function_buttons()
-        
-        # 创建一个堆叠窗口，用于管理不同的功能页面
-        self.stacked_widget = QStackedWidget()
-        # 将堆叠窗口添加到主布局中
-        self.main_layout.addWidget(self.stacked_widget)
-        
-        # 再次调用初始化模块的方法，确保模块初始化完成
-        self.init_modules()
 
     def create_function_buttons(self):
         """
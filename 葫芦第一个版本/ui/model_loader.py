@@ -0,0 +1,51 @@
+# ui/model_loader.py
+# 导入 PyQt5 的核心模块中的类
+from PyQt5.QtCore import QThread, pyqtSignal
+from utils.startup_report import startup_report
+
+
+class ModelLoader(QThread):
+    """
+    后台加载整理流程依赖的重量级模块（cv2、torch、easyocr）和模型，
+    窗口先显示，加载完成后再启用开始整理按钮
+    """
+    # 加载进度 (已完成步骤数, 总步骤数, 当前步骤说明)
+    progress = pyqtSignal(int, int, str)
+    # 加载完成，参数为 EchoSorter 实例
+    loaded = pyqtSignal(object)
+    # 加载失败，参数为错误信息
+    failed = pyqtSignal(str)
+
+    def __init__(self, ui_callback, parent=None):
+        """
+        :param ui_callback: 传给 EchoSorter 的 UI 状态更新回调
+        :param parent: 父对象
+        """
+        super().__init__(parent)
+        self.ui_callback = ui_callback
+
+    def run(self):
+        steps = ("导入识别模块", "加载图片模板", "加载 OCR 模型")
+        try:
+            self.progress.emit(0, len(steps), steps[0])
+            # 导入整理流程，会连带导入 cv2、numpy 等模块
+            from echo_sort.echo_sort import EchoSorter
+            startup_report.mark("识别模块导入完成")
+
+            self.progress.emit(1, len(steps), steps[1])
+            # 创建 GameController 与 ImageTool，预加载模板和套装图标
+            sorter = EchoSorter(self.ui_callback)
+            startup_report.mark("图片模板加载完成")
+
+            self.progress.emit(2, len(steps), steps[2])
+            # 导入 torch/easyocr，加载并预热 OCR 模型
+            from utils.ocr_engine import get_ocr_engine
+            get_ocr_engine().load()
+            startup_report.mark("OCR 模型加载完成")
+
+            self.progress.emit(len(steps), len(steps), "加载完成")
+            self.loaded.emit(sorter)
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            startup_report.report()
@@ -0,0 +1,85 @@
+# utils/attr_lexicon.py
+import json
+import re
+
+# 声骸技能描述从此处开始，之后的文字不再解析
+SKILL_MARKER = "声骸技能"
+
+
+class AttrLexicon:
+    """
+    预编译的词条词典，由 cost.json 一次性构建
+    词条名按长度降序编入同一个正则，实现最长前缀匹配（如“暴击伤害”优先于“暴击”），
+    可以直接切分粘连在一起的词条和数值（如“攻击30.0%”）
+    """
+    def __init__(self, cost_data):
+        """
+        :param cost_data: cost.json 数据
+        """
+        # 各 COST 可选主词条
+        self.cost_attrs = {
+            key: frozenset(cost_data[key]) for key in ("cost1", "cost3", "cost4")
+        }
+        # 主词条（任意 COST）和副词条集合
+        self.main_attrs = frozenset().union(*self.cost_attrs.values())
+        self.sub_attrs = frozenset(cost_data["attr"])
+
+        names = sorted(self.main_attrs | self.sub_attrs, key=len, reverse=True)
+        # 第 1 组为词条名，第 2 组为数值，第 3 组为百分号（可有可无）
+        self._token_re = re.compile(
+            "(" + "|".join(map(re.escape, names)) + r")|(\d+(?:\.\d+)?)(%?)"
+        )
+
+    @classmethod
+    def from_file(cls, path="./data/cost.json"):
+        """
+        从 cost.json 构建词典
+        :param path: cost.json 路径
+        :return: AttrLexicon 实例
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def tokenize(self, text):
+        """
+        将 OCR 文本切分为词条名和数值
+        :param text: 清理后的 OCR 文本
+        :return: (attributes, values) 词条名列表和数值列表，数值为 (float, 是否百分比)
+        """
+        cut = text.find(SKILL_MARKER)
+        if cut >= 0:
+            text = text[:cut]
+
+        attributes = []
+        values = []
+        for match in self._token_re.finditer(text):
+            attr, value, percent = match.groups()
+            if attr:
+                attributes.append(attr)
+            else:
+                values.append((float(value), bool(percent)))
+        return attributes, values
+
+    def parse(self, text):
+        """
+        解析主词条和副词条，attrN_pct 区分百分比数值（攻击30.0%）和固定数值（攻击30）
+        :param text: 清理后的 OCR 文本
+        :return: dict，如 {"attr1": "攻击", "attr1_num": 30.0, "attr1_pct": True, "attr2": "暴击", ...}
+        """
+        attributes, values = self.tokenize(text)
+
+        # 生成键值对：第一个词条须为主词条，其后为副词条
+        attrs = {}
+        attr_index = 1
+        value_index = 0
+        for attr in attributes:
+            valid = self.main_attrs if attr_index == 1 else self.sub_attrs
+            if attr not in valid:
+                continue
+            attrs[f"attr{attr_index}"] = attr
+            if value_index < len(values):
+                attrs[f"attr{attr_index}_num"], attrs[f"attr{attr_index}_pct"] = values[value_index]
+                value_index += 1
+            attr_index += 1
+
+        return attrs
@@ -0,0 +1,147 @@
+# utils/echo_inventory.py
+import os
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+import cv2
+import numpy as np
+from utils.glyph_reader import foreground_mask
+
+# 初始化 logger
+logger = logging.getLogger(__name__)
+
+
+def panel_hash(frame, exclude=None):
+    """
+    详情面板指纹：半分辨率二值化后取哈希，数值词条的差异也会反映在哈希上
+    :param frame: 详情面板 ScreenFrame
+    :param exclude: 不参与哈希的区域 (left, top, right, bottom)，如锁定/弃置图标区域
+    :return: 十六进制哈希字符串
+    """
+    gray = cv2.cvtColor(frame.image, cv2.COLOR_RGB2GRAY)
+    if exclude:
+        gray = gray.copy()
+        left, top = frame.origin
+        gray[exclude[1] - top:exclude[3] - top, exclude[0] - left:exclude[2] - left] = 0
+    small = cv2.resize(gray, (gray.shape[1] // 2, gray.shape[0] // 2), interpolation=cv2.INTER_AREA)
+    bits = np.packbits(foreground_mask(small) > 0)
+    return hashlib.blake2b(bits.tobytes(), digest_size=16).hexdigest()
+
+
+class EchoInventory:
+    """
+    声骸库存（SQLite），以详情面板指纹为键保存识别出的声骸信息
+    再次遇到同一声骸时直接取出识别结果，跳过 OCR；写入先缓存，每排处理完后批量提交
+    """
+    def __init__(self, path="./data/inventory.db"):
+        """
+        :param path: 数据库文件路径
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # 流水线模式下识别线程也会查询，连接在线程间共用并由锁保护
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._pending = {}
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS echoes (
+                    panel_hash TEXT PRIMARY KEY,
+                    name TEXT,
+                    echo_set TEXT,
+                    cost INTEGER,
+                    level INTEGER,
+                    attrs TEXT,
+                    locked INTEGER,
+                    discarded INTEGER,
+                    updated_at REAL
+                )
+            """)
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM echoes").fetchone()[0]
+
+    def get(self, key):
+        """
+        查询声骸信息
+        :param key: 详情面板指纹
+        :return: echo_info 字典，没有记录时返回 None
+        """
+        with self._lock:
+            if key in self._pending:
+                return dict(self._pending[key])
+            row = self._conn.execute(
+                "SELECT name, echo_set, cost, level, attrs, locked, discarded FROM echoes WHERE panel_hash = ?",
+                (key,)
+            ).fetchone()
+        return self._to_info(row) if row else None
+
+    def put(self, key, echo_info):
+        """
+        记录声骸信息（暂存，flush 时写入）
+        :param key: 详情面板指纹
+        :param echo_info: 声骸信息字典
+        """
+        with self._lock:
+            self._pending[key] = dict(echo_info)
+
+    def flush(self):
+        """将暂存的记录在一个事务中批量写入"""
+        with self._lock:
+            if not self._pending:
+                return
+            now = time.time()
+            rows = [self._to_row(key, info, now) for key, info in self._pending.items()]
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO echoes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+                    )
+                self._pending.clear()
+            except sqlite3.Error as e:
+                logger.error(f"声骸库存写入失败: {str(e)}")
+
+    def records(self):
+        """
+        读取全部声骸记录，供强化、配装等模块使用
+        :return: [echo_info]
+        """
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, echo_set, cost, level, attrs, locked, discarded FROM echoes"
+            ).fetchall()
+        return [self._to_info(row) for row in rows]
+
+    def close(self):
+        """写入暂存记录并关闭数据库"""
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _to_row(key, info, now):
+        """echo_info -> 数据库行，词条字段 (attrN / attrN_num / attrN_pct) 合并存为 JSON"""
+        attrs = {k: v for k, v in info.items() if k.startswith("attr")}
+        return (
+            key, info.get("name"), info.get("set"), info.get("cost"), info.get("level"),
+            json.dumps(attrs, ensure_ascii=False),
+            int(bool(info.get("locked"))), int(bool(info.get("discarded"))), now,
+        )
+
+    @staticmethod
+    def _to_info(row):
+        """数据库行 -> echo_info"""
+        name, echo_set, cost, level, attrs, locked, discarded = row
+        info = {"count": 1, "name": name, "set": echo_set, "cost": cost, "level": level}
+        info.update(json.loads(attrs or "{}"))
+        info["locked"] = bool(locked)
+        info["discarded"] = bool(discarded)
+        return info
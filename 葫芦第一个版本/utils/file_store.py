@@ -0,0 +1,36 @@
+# utils/file_store.py
+import os
+
+
+def resolution_key(screen_size):
+    """
+    按分辨率保存的数据所用的键
+    :param screen_size: 屏幕尺寸 (宽, 高)
+    :return: "宽x高"
+    """
+    return f"{screen_size[0]}x{screen_size[1]}"
+
+
+def atomic_write(path, write, tmp_suffix=".tmp"):
+    """
+    先写临时文件再替换目标文件，避免写入中断时损坏原文件；OSError 由调用方处理
+    :param path: 目标文件路径
+    :param write: write(tmp_path)，把内容写入临时文件
+    :param tmp_suffix: 临时文件后缀，np.savez 等会自动补扩展名的写入方式需带上扩展名
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + tmp_suffix
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def write_text_atomic(path, content):
+    """
+    以 UTF-8 文本原子写入文件
+    :param path: 目标文件路径
+    :param content: 文本内容
+    """
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+    atomic_write(path, write)
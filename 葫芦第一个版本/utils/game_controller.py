@@ -1,8 +1,5 @@
 import os
 import random
-import win32gui
-import win32con
-import pyautogui
 import time
 import re
 import logging
@@ -16,8 +13,11 @@ from echo_sort.echo_data import read_echo_info, process_echo, second_echo
 logger = logging.getLogger(__name__)
 
 class GameController:
-    def __init__(self):
-        self.image_tool = ImageTool()
+    def __init__(self, screen_source=None):
+        """
+        :param screen_source: 画面来源 ScreenSource，为 None 时实时截屏
+        """
+        self.image_tool = ImageTool(preload_dir="./image", screen_source=screen_source)  # 启动时预加载全部模板
         self.game_window = None
         self.multiplayer_icon = "./image/multiplayer_icon.png"  # 需准备的图片
         self.load_data()  # 加载数据
@@ -36,6 +36,10 @@ class GameController:
         :param delay: 每次重试间隔(秒)
         :return: (bool) 是否成功激活
         """
+        # win32 接口只在激活游戏窗口时需要，延迟导入以便在非 Windows 环境下回放测试
+        import win32gui
+        import win32con
+
         logger.info("正在跳转到游戏...")
         for _ in range(retry):
             # 1. 获取游戏窗口句柄
@@ -54,9 +58,11 @@ class GameController:
                 
             try:
                 # 2. 激活窗口
+                before = self.image_tool.frame_hash()
                 win32gui.ShowWindow(self.game_window, win32con.SW_RESTORE)
                 win32gui.SetForegroundWindow(self.game_window)
-                time.sleep(2)  # 等待窗口激活
+                # 等待窗口激活；游戏已在前台时画面不变，等到超时
+                self.image_tool.wait_for_update(reference=before, timeout=2)
                 
                 # 3. 调整窗口分辨率（可选）
                 win32gui.MoveWindow(self.game_window, 0, 0, 3440, 1440, True)
@@ -0,0 +1,195 @@
+# utils/glyph_reader.py
+import os
+import logging
+import threading
+from collections import Counter, namedtuple
+import cv2
+import numpy as np
+from utils.file_store import atomic_write
+
+# 初始化 logger
+logger = logging.getLogger(__name__)
+
+# 字形识别结果：文字（不含空格）、所有字形中最低的匹配值
+GlyphMatch = namedtuple("GlyphMatch", ["text", "confidence"])
+
+
+def foreground_mask(gray):
+    """
+    Otsu 二值化得到文字掩码，文字像素应为少数，否则反转
+    :param gray: 灰度图像数组
+    :return: 文字像素为 255 的掩码
+    """
+    _, mask = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    if np.count_nonzero(mask) > mask.size // 2:
+        mask = cv2.bitwise_not(mask)
+    return mask
+
+
+def runs(profile):
+    """
+    投影中连续非零段
+    :param profile: 一维投影数组
+    :return: [(开始, 结束)]，结束不含
+    """
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], (profile > 0).astype(np.int8), [0]))))
+    return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+
+def line_spans(mask, min_height=6):
+    """
+    按水平投影切分文本行
+    :param mask: 文字掩码
+    :param min_height: 最小行高（像素），更矮的视为噪点
+    :return: [(y_min, y_max)]
+    """
+    return [(start, end) for start, end in runs(np.count_nonzero(mask, axis=1)) if end - start >= min_height]
+
+
+class GlyphReader:
+    """
+    游戏固定字体的字形识别器，用于 COST、等级等短文本
+    按行、列投影切出单个字形，缩放到统一尺寸后与字形图集做一次矩阵乘法得到所有相关系数。
+    图集没有预置，由高置信度的 OCR 结果逐步学习并保存到磁盘
+    """
+    def __init__(self, atlas_path="./data/glyph_atlas.npz", glyph_size=20, max_samples=5):
+        """
+        :param atlas_path: 字形图集文件，为 None 时不保存
+        :param glyph_size: 字形统一缩放的边长（像素）
+        :param max_samples: 每个字符最多保留的样本数
+        """
+        self.atlas_path = atlas_path
+        self.glyph_size = glyph_size
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self.templates = np.zeros((0, glyph_size * glyph_size), dtype=np.float32)
+        self.labels = np.zeros(0, dtype="<U1")
+        if atlas_path and os.path.exists(atlas_path):
+            self._load()
+
+    def __len__(self):
+        return len(self.labels)
+
+    def _load(self):
+        """读取字形图集"""
+        try:
+            with np.load(self.atlas_path) as atlas:
+                templates, labels = atlas["templates"], atlas["labels"]
+            if templates.shape[1] != self.glyph_size * self.glyph_size:
+                logger.warning(f"字形图集尺寸不一致，已忽略: {self.atlas_path}")
+                return
+            self.templates = templates.astype(np.float32)
+            self.labels = labels.astype("<U1")
+            logger.info(f"已加载字形图集 {len(self.labels)} 个样本: {self.atlas_path}")
+        except (OSError, KeyError, ValueError) as e:
+            logger.error(f"字形图集读取失败: {str(e)}")
+
+    def _save(self):
+        """保存字形图集（先写临时文件再替换，避免中断时损坏）"""
+        if not self.atlas_path:
+            return
+        try:
+            atomic_write(
+                self.atlas_path,
+                lambda tmp_path: np.savez_compressed(tmp_path, templates=self.templates, labels=self.labels),
+                tmp_suffix=".tmp.npz",
+            )
+        except OSError as e:
+            logger.error(f"字形图集保存失败: {str(e)}")
+
+    def segment(self, gray):
+        """
+        切分字形
+        :param gray: 文字区域灰度图像数组
+        :return: [(行号, x_min, x_max, 归一化字形向量)]，按行从上到下、行内从左到右
+        """
+        mask = foreground_mask(gray)
+        glyphs = []
+        for line, (y_min, y_max) in enumerate(line_spans(mask)):
+            band = mask[y_min:y_max]
+            for x_min, x_max in runs(np.count_nonzero(band, axis=0)):
+                glyphs.append((line, x_min, x_max, self._vectorize(band[:, x_min:x_max])))
+        return glyphs
+
+    def _vectorize(self, glyph):
+        """
+        字形按行高放到正方形画布中央再缩放，保留宽窄和上下位置信息（如 1 与 7、句点）
+        :param glyph: 单个字形的掩码切片，高度为整行行高
+        :return: 零均值、单位范数的一维向量
+        """
+        height, width = glyph.shape
+        side = max(height, width)
+        canvas = np.zeros((side, side), dtype=np.uint8)
+        left = (side - width) // 2
+        top = (side - height) // 2
+        canvas[top:top + height, left:left + width] = glyph
+        vector = cv2.resize(canvas, (self.glyph_size, self.glyph_size),
+                            interpolation=cv2.INTER_AREA).astype(np.float32).ravel()
+        vector -= vector.mean()
+        return vector / max(float(np.linalg.norm(vector)), 1e-6)
+
+    def read(self, gray):
+        """
+        识别文字区域
+        :param gray: 文字区域灰度图像数组
+        :return: GlyphMatch，图集为空或没有字形时返回 GlyphMatch("", 0.0)
+        """
+        with self._lock:
+            templates, labels = self.templates, self.labels
+        glyphs = self.segment(gray)
+        if not glyphs or not len(labels):
+            return GlyphMatch("", 0.0)
+
+        # (字形数, 样本数) 的相关系数矩阵，每个字形取最相近的样本
+        scores = np.stack([vector for _, _, _, vector in glyphs]) @ templates.T
+        best = scores.argmax(axis=1)
+        text = "".join(labels[best].tolist())
+        return GlyphMatch(text, float(scores[np.arange(len(best)), best].min()))
+
+    def learn(self, gray, ocr_results, min_confidence=0.9):
+        """
+        用 OCR 结果为字形打标签并加入图集
+        只学习 OCR 置信度足够高、且字符数与切出的字形数一致的文本行
+        :param gray: 文字区域灰度图像数组
+        :param ocr_results: easyocr readtext(detail=1) 结果 [(四角坐标, 文字, 置信度)]，坐标相对于 gray
+        :param min_confidence: OCR 最低置信度
+        :return: 新增样本数
+        """
+        glyphs = self.segment(gray)
+        mask = foreground_mask(gray)
+        spans = line_spans(mask)
+        samples = []
+        for box, text, confidence in ocr_results:
+            chars = [c for c in text if not c.isspace()]
+            if confidence < min_confidence or not chars:
+                continue
+            xs = [point[0] for point in box]
+            ys = [point[1] for point in box]
+            center_y = (min(ys) + max(ys)) / 2
+            # OCR 文本框所在的行
+            lines = [index for index, (y_min, y_max) in enumerate(spans) if y_min <= center_y < y_max]
+            if len(lines) != 1:
+                continue
+            in_box = [vector for line, x_min, x_max, vector in glyphs
+                      if line == lines[0] and x_min >= min(xs) - 2 and x_max <= max(xs) + 2]
+            if len(in_box) == len(chars):
+                samples.extend(zip(chars, in_box))
+
+        if not samples:
+            return 0
+        with self._lock:
+            counts = Counter(self.labels.tolist())
+            new_vectors, new_labels = [], []
+            for char, vector in samples:
+                if counts[char] >= self.max_samples:
+                    continue
+                counts[char] += 1
+                new_vectors.append(vector)
+                new_labels.append(char)
+            if not new_labels:
+                return 0
+            self.templates = np.concatenate([self.templates, np.stack(new_vectors)])
+            self.labels = np.concatenate([self.labels, np.array(new_labels, dtype="<U1")])
+            self._save()
+        logger.info(f"字形图集新增样本: {''.join(new_labels)}，共 {len(self.labels)} 个")
+        return len(new_labels)
@@ -0,0 +1,109 @@
+# utils/grid_scanner.py
+import os
+import json
+import logging
+import cv2
+import numpy as np
+from utils.file_store import write_text_atomic
+
+# 初始化 logger
+logger = logging.getLogger(__name__)
+
+# 声骸背包首排缩略图区域 (left, top, right, bottom)，10 个格子，格子间距 220
+GRID_ROW_REGION = (275, 155, 2475, 395)
+GRID_COLUMNS = 10
+GRID_CELL_PITCH = 220
+GRID_CELL_WIDTH = 205
+# 相邻两排的行距，第二排缩略图区域即首排区域下移一个行距
+GRID_ROW_PITCH = 280
+GRID_SECOND_ROW_REGION = (275, 155 + GRID_ROW_PITCH, 2475, 395 + GRID_ROW_PITCH)
+# 格子四周裁掉的边距，避开选中高亮边框
+GRID_CELL_MARGIN = 16
+
+
+def dhash(gray, size=16):
+    """
+    差值感知哈希：缩小到 (size+1)*size 后比较相邻像素的明暗
+    :param gray: 灰度图像数组
+    :param size: 哈希边长，结果为 size*size 位
+    :return: 十六进制哈希字符串
+    """
+    small = cv2.resize(gray, (size + 1, size), interpolation=cv2.INTER_AREA)
+    bits = np.packbits(small[:, 1:] > small[:, :-1])
+    return bits.tobytes().hex()
+
+
+class GridScanner:
+    """声骸背包格子扫描：一次截取一整排缩略图，逐格计算感知哈希"""
+    def __init__(self, image_tool, region=GRID_ROW_REGION):
+        """
+        :param image_tool: ImageTool 实例
+        :param region: 首排缩略图区域 (left, top, right, bottom)
+        """
+        self.image_tool = image_tool
+        self.region = region
+
+    def scan_row(self, region=None):
+        """
+        截取一排缩略图并计算每格的哈希
+        :param region: 该排缩略图区域，为 None 时为首排
+        :return: [哈希] 共 GRID_COLUMNS 个，按点击位置 375 + n*220 的顺序
+        """
+        row = cv2.cvtColor(self.image_tool.grab(region or self.region), cv2.COLOR_RGB2GRAY)
+        hashes = []
+        for n in range(GRID_COLUMNS):
+            left = n * GRID_CELL_PITCH + GRID_CELL_MARGIN
+            cell = row[GRID_CELL_MARGIN:-GRID_CELL_MARGIN, left:n * GRID_CELL_PITCH + GRID_CELL_WIDTH - GRID_CELL_MARGIN]
+            hashes.append(dhash(cell))
+        return hashes
+
+
+class SortMarker:
+    """
+    上次整理的边界标记：记录上次整理后背包首排（最新的 GRID_COLUMNS 个声骸）的缩略图哈希序列，保存到磁盘
+    背包按获得时间排序，新声骸排在前面，上次的首排整体后移；本次在缩略图中找到这段连续序列的位置，
+    之前的是新声骸，从该位置起都是已整理过的声骸
+    单个缩略图哈希不唯一（同种类、同品质的 +0 声骸缩略图相同），只按整段序列定位
+    """
+    def __init__(self, path="./data/sort_marker.json", min_distinct=3):
+        """
+        :param path: 标记文件路径
+        :param min_distinct: 序列中至少包含的不同哈希数，过于单一的序列（如一整排相同的声骸）无法可靠定位
+        """
+        self.path = path
+        self.min_distinct = min_distinct
+        self._anchor = []
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._anchor = json.load(f).get("anchor", [])
+            except (OSError, ValueError, AttributeError) as e:
+                logger.error(f"整理边界标记读取失败: {str(e)}")
+
+    def find(self, hashes):
+        """
+        在本次的缩略图哈希序列中查找上次首排的位置
+        :param hashes: 当前首排及其后一排的缩略图哈希，共 2 * GRID_COLUMNS 个
+        :return: 上次首排在当前首排中的起始位置 0 ~ GRID_COLUMNS-1（即本排新声骸数），未找到时返回 None
+        """
+        anchor = self._anchor
+        if not anchor:
+            return None
+        if len(set(anchor)) < self.min_distinct:
+            logger.warning("上次首排的声骸缩略图过于相似，无法定位整理边界，将处理全部声骸")
+            return None
+        for position in range(min(GRID_COLUMNS, len(hashes) - len(anchor) + 1)):
+            if hashes[position:position + len(anchor)] == anchor:
+                return position
+        return None
+
+    def update(self, hashes):
+        """
+        记录本次整理后的首排缩略图哈希并保存
+        :param hashes: 首排缩略图哈希
+        """
+        self._anchor = list(hashes)
+        try:
+            write_text_atomic(self.path, json.dumps({"anchor": self._anchor}))
+        except OSError as e:
+            logger.error(f"整理边界标记保存失败: {str(e)}")
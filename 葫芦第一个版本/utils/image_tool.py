@@ -1,23 +1,219 @@
 # utils/image_tool.py
-import difflib
 import cv2
 import numpy as np
-import pyautogui
-from PIL import ImageGrab
+from PIL import Image
 import os
 import re
-import easyocr
-import json
+import time
+import hashlib
 import logging
+import threading
+from utils.template_cache import TemplateCache, binarize
+from utils.set_classifier import SetIconClassifier
+from utils.attr_lexicon import AttrLexicon
+from utils.name_resolver import EchoNameResolver, normalize_name
+from utils.screen_source import create_screen_source
+from utils.ocr_engine import get_ocr_engine
+from utils.glyph_reader import GlyphReader, foreground_mask, line_spans
+from utils.ocr_cache import OcrCache
+from utils.location_hints import LocationHints
+from utils.scroll_calibration import ScrollCalibration
+from utils.input_sink import get_input_sink
+from utils.metrics import metrics
 
 # 初始化 logger
 logger = logging.getLogger(__name__)
 
+# 全屏模板匹配的金字塔缩小倍数，及使用金字塔时缩小后模板的最小边长
+PYRAMID_SCALE = 4
+PYRAMID_MIN_TEMPLATE = 8
+
+class ScreenFrame:
+    """
+    一次截屏得到的画面快照，各识别步骤通过 crop 取得切片视图，不再重复截屏
+    :param image: 截图数组 (RGB)
+    :param origin: 截图左上角在屏幕上的坐标 (left, top)
+    """
+    def __init__(self, image, origin=(0, 0)):
+        self.image = image
+        self.origin = origin
+
+    def crop(self, region):
+        """
+        按屏幕坐标裁剪子区域（numpy 切片视图，不复制数据）
+        :param region: 裁剪区域 (left, top, right, bottom)，屏幕坐标
+        :return: 子区域数组视图
+        """
+        left, top = self.origin
+        height, width = self.image.shape[:2]
+        x1, y1 = region[0] - left, region[1] - top
+        x2, y2 = region[2] - left, region[3] - top
+        if x1 < 0 or y1 < 0 or x2 > width or y2 > height or x2 <= x1 or y2 <= y1:
+            raise ValueError(f"裁剪区域 {region} 超出快照范围")
+        return self.image[y1:y2, x1:x2]
+
+
 class ImageTool:
-    def __init__(self):
-        self.reader = easyocr.Reader(['ch_sim', 'en'], gpu=True)  # 初始化 easyocr 读取器，启用 GPU 加速
+    def __init__(self, debug_dump=False, preload_dir=None, screen_source=None, recognition_only=False):
+        """
+        :param debug_dump: 是否将识别区域另存到磁盘（仅调试用，默认关闭）
+        :param preload_dir: 启动时预加载模板的目录，为 None 时按需加载
+        :param screen_source: 画面来源 ScreenSource，为 None 时实时截屏
+        :param recognition_only: 固定区域跳过文字检测网络，只做文字识别（见 read_regions）
+        """
+        self.screen_source = screen_source or create_screen_source()
+        self.debug_dump = debug_dump
+        self.recognition_only = recognition_only
+        # 预处理后的模板缓存
+        self.template_cache = TemplateCache()
+        if preload_dir:
+            self.template_cache.preload(preload_dir)
+        # 套装图标分类器，图标只在此处加载一次
+        self.set_classifier = SetIconClassifier()
+        # 词条词典，cost.json 只在此处读取一次
+        self.attr_lexicon = AttrLexicon.from_file()
+        # 模板位置提示，全屏搜索时先搜索上次找到的位置附近
+        self.location_hints = LocationHints()
+        self._screen_size = None
+        # 滚轮校准，按分辨率记录每个滚轮单位移动的像素
+        self.scroll_calibration = ScrollCalibration()
+        # OCR 结果缓存，内容相同的截图不再重复识别
+        self.ocr_cache = OcrCache()
+        # 固定字体的字形识别器，图集由 OCR 结果逐步学习
+        self.glyph_reader = GlyphReader()
+        # 声骸名称纠错器，首次调用 find_name 时按 echo_data 构建
+        self._name_resolver = None
+        self._name_resolver_source = None
+        self._name_resolver_lock = threading.Lock()
+
+    @property
+    def reader(self):
+        """进程内共用的 easyocr 读取器，首次识别时才加载模型；调用时须持有 _inference_lock"""
+        return get_ocr_engine().reader
+
+    @property
+    def _inference_lock(self):
+        """OCR 推理锁，流水线模式下各识别线程和主线程的回退识别共用同一个读取器"""
+        return get_ocr_engine().inference_lock
+
+    def grab(self, region=None):
+        """
+        截取屏幕并转换为数组
+        :param region: 截取区域 (left, top, right, bottom)，为 None 时截取全屏
+        :return: 截图数组 (RGB)
+        """
+        return self.screen_source.grab(region)
+
+    def snapshot(self, region=None):
+        """
+        截取一帧画面快照，供同一声骸的多个识别步骤共用
+        :param region: 快照区域 (left, top, right, bottom)，为 None 时截取全屏
+        :return: ScreenFrame 实例
+        """
+        origin = (region[0], region[1]) if region else (0, 0)
+        image = self.grab(region)
+        # 环形缓冲中的画面会被后续截屏覆盖，快照需要保留到识别结束，复制一份
+        if self.screen_source.transient:
+            image = image.copy()
+        return ScreenFrame(image, origin)
+
+    def screen_size(self):
+        """
+        屏幕分辨率，全屏匹配时已记录则直接返回，否则截取一次全屏
+        :return: (宽, 高)
+        """
+        if self._screen_size is None:
+            screen = self.grab()
+            self._screen_size = (screen.shape[1], screen.shape[0])
+        return self._screen_size
+
+    def frame_hash(self, region=None, scale=8):
+        """
+        画面指纹：灰度图缩小并量化后取哈希，忽略细微噪点
+        :param region: 区域 (left, top, right, bottom)，为 None 时为全屏
+        :param scale: 缩小倍数
+        :return: 哈希值 bytes
+        """
+        gray = cv2.cvtColor(self.grab(region), cv2.COLOR_RGB2GRAY)
+        size = (max(1, gray.shape[1] // scale), max(1, gray.shape[0] // scale))
+        small = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+        return hashlib.blake2b((small >> 4).tobytes(), digest_size=8).digest()
+
+    def _poll(self, timeout, interval):
+        """按间隔轮询，直到超时；轮询次数同时受限，回放时等待不实际休眠也能结束"""
+        deadline = time.monotonic() + timeout
+        for _ in range(max(1, int(timeout / interval))):
+            get_input_sink().sleep(interval)
+            yield
+            if time.monotonic() >= deadline:
+                return
 
-    def find_image(self, template_path, region=None, confidence=0.7, grayscale=True, save_screenshot=False, screenshot_path="./screenshot.png"):
+    @metrics.traced("wait.change")
+    def wait_for_change(self, region=None, reference=None, timeout=1.0, interval=0.02, after=None, scale=8):
+        """
+        等待区域画面发生变化
+        :param region: 区域 (left, top, right, bottom)，为 None 时为全屏
+        :param reference: 变化前的 frame_hash，为 None 时取调用时的画面
+        :param timeout: 超时时间（秒）
+        :param interval: 轮询间隔（秒）
+        :param after: 输入操作返回的完成通知 (Future)，提供时等操作实际发出后再开始轮询
+        :param scale: frame_hash 的缩小倍数，须与 reference 一致
+        :return: (bool) 超时前画面是否发生变化
+        """
+        if reference is None:
+            reference = self.frame_hash(region, scale)
+        if after is not None:
+            try:
+                after.result(timeout)
+            except Exception as e:
+                logger.warning(f"等待输入操作完成失败: {str(e)}")
+        for _ in self._poll(timeout, interval):
+            if self.frame_hash(region, scale) != reference:
+                return True
+        return False
+
+    @metrics.traced("wait.stable")
+    def wait_for_stable(self, region=None, timeout=1.0, interval=0.02, settle=2, scale=8):
+        """
+        等待区域画面稳定（动画结束）
+        :param region: 区域 (left, top, right, bottom)，为 None 时为全屏
+        :param timeout: 超时时间（秒）
+        :param interval: 轮询间隔（秒）
+        :param settle: 连续多少次轮询画面不变视为稳定；淡入淡出过程中也会偶尔出现相邻两帧相同，至少取 2
+        :param scale: frame_hash 的缩小倍数
+        :return: (bool) 超时前画面是否稳定
+        """
+        last = self.frame_hash(region, scale)
+        unchanged = 0
+        for _ in self._poll(timeout, interval):
+            current = self.frame_hash(region, scale)
+            if current == last:
+                unchanged += 1
+                if unchanged >= settle:
+                    return True
+            else:
+                unchanged = 0
+                last = current
+        return False
+
+    def wait_for_update(self, region=None, reference=None, timeout=1.0, after=None, stable_timeout=None, scale=8):
+        """
+        操作后等待界面刷新：先等画面变化，再等画面稳定
+        :param region: 区域 (left, top, right, bottom)，为 None 时为全屏
+        :param reference: 操作前的 frame_hash
+        :param timeout: 等待画面变化的超时时间（秒）
+        :param after: 输入操作返回的完成通知 (Future)，见 wait_for_change
+        :param stable_timeout: 等待画面稳定的超时时间（秒），为 None 时与 timeout 相同
+        :param scale: frame_hash 的缩小倍数，须与 reference 一致
+        :return: (bool) 画面是否发生变化
+        """
+        if not self.wait_for_change(region, reference, timeout, after=after, scale=scale):
+            return False
+        self.wait_for_stable(region, timeout if stable_timeout is None else stable_timeout, scale=scale)
+        return True
+
+    @metrics.traced("find_image")
+    def find_image(self, template_path, region=None, confidence=0.7, grayscale=True, save_screenshot=False, screenshot_path="./screenshot.png", frame=None):
         """
         增强版图像识别方法
         :param template_path: 模板图片路径
@@ -26,12 +222,40 @@ class ImageTool:
         :param grayscale: 是否使用灰度匹配
         :param save_screenshot: 是否保存截取的屏幕图像
         :param screenshot_path: 保存截取屏幕图像的路径
+        :param frame: 画面快照 ScreenFrame，提供时从快照裁剪而不重新截屏
         :return: (x, y) 中心坐标 或 None
         """
+        # 全屏搜索时先在上次找到的位置附近搜索
+        if region is None and frame is None and self.location_hints is not None:
+            hint_region = self.location_hints.search_region(self._screen_size, template_path) if self._screen_size else None
+            if hint_region:
+                position = self._find_image(template_path, hint_region, confidence, grayscale,
+                                            save_screenshot, screenshot_path, None)
+                if position:
+                    return position
+                logger.info(f"位置提示未命中，搜索全屏：{template_path}")
+            position = self._find_image(template_path, None, confidence, grayscale,
+                                        save_screenshot, screenshot_path, None)
+            if position:
+                h, w = self.template_cache.get(template_path, grayscale).shape[:2]
+                left, top = position[0] - w // 2, position[1] - h // 2
+                self.location_hints.update(self._screen_size, template_path, (left, top, left + w, top + h))
+            return position
+        return self._find_image(template_path, region, confidence, grayscale, save_screenshot, screenshot_path, frame)
+
+    def _find_image(self, template_path, region, confidence, grayscale, save_screenshot, screenshot_path, frame):
+        """find_image 的实际匹配过程，参数同 find_image"""
         try:
-            # 截取屏幕
-            screen = ImageGrab.grab(bbox=region) if region else ImageGrab.grab()
-            screen = np.array(screen)
+            # 截取屏幕（有快照时直接取快照的切片）
+            if frame is not None:
+                screen = frame.crop(region) if region else frame.image
+                offset = (region[0], region[1]) if region else frame.origin
+            else:
+                screen = self.grab(region)
+                offset = (region[0], region[1]) if region else (0, 0)
+                if region is None:
+                    # 记录屏幕分辨率，位置提示按分辨率区分
+                    self._screen_size = (screen.shape[1], screen.shape[0])
 
             # 转换为灰度图像
             if grayscale:
@@ -41,48 +265,93 @@ class ImageTool:
                     pass  # 已经是灰度图像
                 else:
                     raise ValueError("输入图像的通道数不正确")
-                # 高斯模糊去噪
-                screen = cv2.GaussianBlur(screen, (3, 3), 0)
-                # 自适应二值化
-                screen = cv2.adaptiveThreshold(screen, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-                                            cv2.THRESH_BINARY, 11, 2)
 
-            # 对模板做相同处理
-            template = cv2.imread(template_path, 0 if grayscale else 1)
-            if template is None:
-                raise FileNotFoundError(f"模板图片不存在: {template_path}")
+            # 模板从缓存中取出，已做过相同处理
+            template = self.template_cache.get(template_path, grayscale)
 
-            if grayscale:
-                template = cv2.GaussianBlur(template, (3, 3), 0)
-                template = cv2.adaptiveThreshold(template, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                                            cv2.THRESH_BINARY, 11, 2)
-                
             # 保存截图
             if save_screenshot:
                 cv2.imwrite(screenshot_path, screen)
-                
-            # 模板匹配
-            res = cv2.matchTemplate(screen, template, cv2.TM_CCOEFF_NORMED)
-            _, max_val, _, max_loc = cv2.minMaxLoc(res)
+
+            if grayscale and region is None and min(template.shape[:2]) >= PYRAMID_MIN_TEMPLATE * PYRAMID_SCALE:
+                # 全屏搜索：先在缩小的图像上粗定位，再在原分辨率的小窗口内精确匹配
+                max_val, max_loc = self._match_pyramid(screen, template_path, template)
+            else:
+                # 高斯模糊去噪 + 自适应二值化
+                if grayscale:
+                    screen = binarize(screen)
+                res = cv2.matchTemplate(screen, template, cv2.TM_CCOEFF_NORMED)
+                _, max_val, _, max_loc = cv2.minMaxLoc(res)
             logger.info(f"匹配图片：{template_path},最大匹配值: {max_val}")
 
             if max_val >= confidence:
                 h, w = template.shape[:2]
                 return (
-                    max_loc[0] + w // 2 + (region[0] if region else 0),
-                    max_loc[1] + h // 2 + (region[1] if region else 0)
+                    max_loc[0] + w // 2 + offset[0],
+                    max_loc[1] + h // 2 + offset[1]
                 )
             return None
         except Exception as e:
             logger.error(f"图像识别失败: {str(e)}")
             return None
 
-    def capture_region(self, region, filename, folder="./image"):
+    @metrics.traced("match_templates")
+    def match_templates(self, template_paths, region, frame=None):
+        """
+        同一区域一次截取、一次预处理，对多个模板逐一打分
+        :param template_paths: 模板图片路径列表
+        :param region: 搜索区域 (left, top, right, bottom)
+        :param frame: 画面快照 ScreenFrame，提供时从快照裁剪而不重新截屏
+        :return: 与 template_paths 顺序一致的最大匹配值列表
+        """
+        screen = frame.crop(region) if frame is not None else self.grab(region)
+        screen = binarize(cv2.cvtColor(screen, cv2.COLOR_BGR2GRAY))
+        scores = []
+        for template_path in template_paths:
+            template = self.template_cache.get(template_path, True)
+            _, max_val, _, _ = cv2.minMaxLoc(cv2.matchTemplate(screen, template, cv2.TM_CCOEFF_NORMED))
+            scores.append(max_val)
+        return scores
+
+    def _match_pyramid(self, gray, template_path, template, candidates=3):
+        """
+        金字塔匹配：在 1/PYRAMID_SCALE 图像上找出若干候选位置，只在候选附近的原分辨率窗口内二值化并匹配
+        :param gray: 灰度截图
+        :param template_path: 模板图片路径
+        :param template: 原分辨率的预处理模板
+        :param candidates: 粗匹配保留的候选数
+        :return: (最大匹配值, 左上角坐标)，坐标为 gray 内坐标
+        """
+        scale = PYRAMID_SCALE
+        small = cv2.resize(gray, (gray.shape[1] // scale, gray.shape[0] // scale), interpolation=cv2.INTER_AREA)
+        small_template = self.template_cache.get(template_path, True, scale=scale)
+        res = cv2.matchTemplate(binarize(small), small_template, cv2.TM_CCOEFF_NORMED)
+
+        h, w = template.shape[:2]
+        pad = 2 * scale
+        best_val, best_loc = -1.0, (0, 0)
+        for _ in range(candidates):
+            _, _, _, (x, y) = cv2.minMaxLoc(res)
+            # 抑制已选候选附近的位置，下一轮取其它峰值
+            res[max(0, y - 2):y + 3, max(0, x - 2):x + 3] = -1.0
+            left, top = max(0, x * scale - pad), max(0, y * scale - pad)
+            right, bottom = min(gray.shape[1], x * scale + w + pad), min(gray.shape[0], y * scale + h + pad)
+            window = binarize(gray[top:bottom, left:right])
+            if window.shape[0] < h or window.shape[1] < w:
+                continue
+            _, val, _, loc = cv2.minMaxLoc(cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED))
+            if val > best_val:
+                best_val, best_loc = val, (loc[0] + left, loc[1] + top)
+        return best_val, best_loc
+
+    @metrics.traced("capture_region")
+    def capture_region(self, region, filename, folder="./image", frame=None):
         """
         截取指定区域并保存到文件
         :param region: (left, top, width, height)
         :param filename: 保存文件名（无需后缀）
         :param folder: 保存目录
+        :param frame: 画面快照 ScreenFrame，提供时从快照裁剪而不重新截屏
         :return: (bool) 是否保存成功
         """
         try:
@@ -101,7 +370,8 @@ class ImageTool:
             os.makedirs(folder, exist_ok=True)
             
             # 截取并保存
-            screenshot = ImageGrab.grab(bbox=actual_region)
+            source = frame.crop(actual_region) if frame is not None else self.grab(actual_region)
+            screenshot = Image.fromarray(source)
             filepath = os.path.join(folder, f"{filename}.png")
             screenshot.save(filepath)
             return True
@@ -110,78 +380,156 @@ class ImageTool:
             logger.error(f"截图保存失败：{str(e)}")
             return False
 
+    @metrics.traced("ocr.readtext")
+    def read_text(self, image, detail=0, paragraph=True):
+        """
+        对内存中的图像数组直接做文字识别，不经过 PNG 编码和磁盘读写
+        :param image: 图像数组 (RGB)，也兼容图片路径
+        :param detail: 传给 easyocr 的 detail 参数
+        :param paragraph: 传给 easyocr 的 paragraph 参数
+        :return: easyocr 识别结果列表
+        """
+        if isinstance(image, str):
+            with self._inference_lock:
+                return self.reader.readtext(image, detail=detail, paragraph=paragraph)
+        key = self.ocr_cache.key(image, "readtext", detail, paragraph)
+        result = self.ocr_cache.get(key)
+        if result is None:
+            result = tuple(self._readtext(image, detail, paragraph))
+            self.ocr_cache.put(key, result)
+        # 返回副本，调用方可以自由修改
+        return list(result)
+
+    def _readtext(self, image, detail, paragraph):
+        """
+        与 reader.readtext 相同的检测 + 识别流程，但分别提供两者的输入
+        easyocr 把三通道数组当作 BGR 转灰度，直接传 RGB 会使识别网络看到的灰度与读取 PNG 时不同；
+        检测网络则按 RGB 使用。这里检测用 RGB 原图，识别用按 RGB 正确转换的灰度图，与读取 PNG 时一致
+        :param image: 图像数组 (RGB) 或灰度数组
+        :return: easyocr 识别结果列表
+        """
+        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY) if image.ndim == 3 else image
+        with self._inference_lock:
+            horizontal_list, free_list = self.reader.detect(image)
+            return self.reader.recognize(gray, horizontal_list=horizontal_list[0], free_list=free_list[0],
+                                         detail=detail, paragraph=paragraph)
+
+    @metrics.traced("ocr.read_regions")
+    def read_regions(self, frame, regions):
+        """
+        识别快照中若干固定区域的文字，跳过 CRAFT 文字检测：
+        按行投影把每个区域切成文本行，所有行一次送入识别网络
+        :param frame: 画面快照 ScreenFrame
+        :param regions: {区域名: (left, top, right, bottom)} 屏幕坐标
+        :return: {区域名: [逐行文字]}
+        """
+        # 整个快照只转一次灰度，行坐标统一换算到快照内
+        gray_frame = ScreenFrame(cv2.cvtColor(frame.image, cv2.COLOR_RGB2GRAY), frame.origin)
+        boxes = []
+        owners = []
+        for key, region in regions.items():
+            left, top = region[0] - frame.origin[0], region[1] - frame.origin[1]
+            sub = gray_frame.crop(region)
+            for x_min, x_max, y_min, y_max in self._split_lines(sub):
+                boxes.append([left + x_min, left + x_max, top + y_min, top + y_max])
+                owners.append(key)
+
+        texts = {key: [] for key in regions}
+        for owner, (text, _) in zip(owners, self.recognize_lines(gray_frame.image, boxes)):
+            if text:
+                texts[owner].append(text)
+        return texts
+
+    def recognize_lines(self, gray, boxes):
+        """
+        只运行识别网络，对已知文本行批量识别
+        :param gray: 灰度图像数组
+        :param boxes: 文本行列表 [[x_min, x_max, y_min, y_max], ...]
+        :return: 与 boxes 顺序一致的 [(文字, 置信度), ...]
+        """
+        # 内容相同的文本行直接取缓存，其余行一次批量识别
+        keys = [self.ocr_cache.key(gray[box[2]:box[3], box[0]:box[1]], "line") for box in boxes]
+        lines = [self.ocr_cache.get(key) for key in keys]
+        missing = [box for box, line in zip(boxes, lines) if line is None]
+        if not missing:
+            return lines
+        try:
+            results = self._recognize_batched(gray, missing)
+        except (ImportError, AttributeError, TypeError) as e:
+            # easyocr 内部接口变化时退回公开的 recognize 接口（CPU 下逐行识别）
+            logger.warning(f"批量识别不可用，改用 reader.recognize: {str(e)}")
+            with self._inference_lock:
+                results = self.reader.recognize(gray, horizontal_list=missing, free_list=[],
+                                                detail=1, paragraph=False, batch_size=len(missing))
+
+        # 识别结果按行坐标对应回输入顺序
+        by_corner = {(int(box[0][0]), int(box[0][1])): (text, conf) for box, text, conf in results}
+        for index, (box, key) in enumerate(zip(boxes, keys)):
+            if lines[index] is None:
+                lines[index] = by_corner.get((box[0], box[2]), ("", 0.0))
+                self.ocr_cache.put(key, lines[index])
+        return lines
+
+    def _recognize_batched(self, gray, boxes):
+        """调用 easyocr 识别网络，所有文本行组成一个批次做一次前向计算"""
+        from easyocr.utils import get_image_list
+        from easyocr.recognition import get_text
+
+        reader = self.reader
+        image_list, max_width = get_image_list(boxes, [], gray, model_height=reader.imgH)
+        ignore_char = ''.join(set(reader.character) - set(reader.lang_char))
+        with self._inference_lock:
+            return get_text(reader.character, reader.imgH, int(max_width), reader.recognizer,
+                            reader.converter, image_list, ignore_char, 'greedy', 5, len(image_list),
+                            0.1, 0.5, 0.003, 0, reader.device)
+
+    @staticmethod
+    def _split_lines(gray, min_height=6, padding=4):
+        """
+        按水平投影把区域切成文本行
+        :param gray: 区域灰度图像
+        :param min_height: 最小行高（像素），更矮的视为噪点
+        :param padding: 每行四周留白（像素）
+        :return: [(x_min, x_max, y_min, y_max), ...] 区域内坐标
+        """
+        mask = foreground_mask(gray)
+        height, width = mask.shape
+
+        lines = []
+        for start, end in line_spans(mask, min_height):
+            cols = np.flatnonzero(np.count_nonzero(mask[start:end], axis=0))
+            lines.append((
+                max(0, int(cols[0]) - padding), min(width, int(cols[-1]) + 1 + padding),
+                max(0, int(start) - padding), min(height, int(end) + padding),
+            ))
+        return lines
+
+    def dump_region(self, image, filename, folder="./image/region"):
+        """
+        调试用：debug_dump 打开时将识别区域保存到磁盘，关闭时不做任何事
+        :param image: 图像数组 (RGB)
+        :param filename: 保存文件名（无需后缀）
+        :param folder: 保存目录
+        """
+        if not self.debug_dump:
+            return
+        try:
+            os.makedirs(folder, exist_ok=True)
+            Image.fromarray(image).save(os.path.join(folder, f"{filename}.png"))
+        except Exception as e:
+            logger.error(f"调试截图保存失败：{str(e)}")
+
     def _clean_text(self, text):
         """清理OCR识别结果"""
         return ''.join(text).strip().replace('\n', '').replace('\f', '')
     
     def _parse_attr(self, text):
-        """解析词条"""
-        # 预处理文本
-        cleaned_text = ''.join(text).strip().replace('\n', '').replace('\f', '')
-        cleaned_text = re.sub(r'声骸技能.*', '', cleaned_text)
-
-        # 拆分所有元素
-        elements = cleaned_text.split()
-        
-        # 初始化属性列表和数值列表
-        attributes = []
-        values = []
-        
-        # 正则表达式匹配组合属性（如"攻击30.0%"）和纯数值
-        pattern_combined = re.compile(r'^([^\d]+?)(\d+\.?\d*%?)$')  # 组合属性
-        pattern_value = re.compile(r'^\d+\.?\d*%?$')                # 纯数值
-        
-        for elem in elements:
-            # 处理组合属性（属性+数值）
-            match_combined = pattern_combined.match(elem)
-            if match_combined:
-                attr = match_combined.group(1).strip()
-                value = match_combined.group(2).strip()
-                attributes.append(attr)
-                values.append(value)
-                continue
-            
-            # 处理纯数值
-            if pattern_value.match(elem):
-                values.append(elem)
-                continue
-            
-            # 处理纯属性
-            attributes.append(elem.strip())
-            # 输出当前的 attributes 和 values 列表内容
-
-        # 读取 cost.json 文件
-        with open('./data/cost.json', 'r', encoding='utf-8') as f:
-            cost_data = json.load(f)
-
-        # 生成键值对
-        attrs = {}
-        attr_index = 1
-        value_index = 0
-        for i in range(len(attributes)):
-            attr = attributes[i]
-            if attr_index == 1:  # attr1
-                if attr in cost_data["cost4"] or attr in cost_data["cost3"] or attr in cost_data["cost1"]:
-                    attrs[f"attr{attr_index}"] = attr
-                    if value_index < len(values):
-                        attrs[f"attr{attr_index}_num"] = values[value_index]
-                        value_index += 1
-                    attr_index += 1
-            else:  # attr2 - attr7
-                if attr in cost_data["attr"]:
-                    attrs[f"attr{attr_index}"] = attr
-                    if value_index < len(values):
-                        attrs[f"attr{attr_index}_num"] = values[value_index]
-                        value_index += 1
-                    attr_index += 1
- 
-        # 如果 attr1 不存在，将 attr2 的值改为 attr1
-        if "attr1" not in attrs and "attr2" in attrs:
-            attrs["attr1"] = attrs.pop("attr2")
-            if "attr2_num" in attrs:
-                attrs["attr1_num"] = attrs.pop("attr2_num")
-        
-        return attrs
+        """
+        解析词条，词条数值为 float，attrN_pct 标记数值是否为百分比
+        :param text: OCR 识别结果列表
+        :return: dict，如 {"attr1": "攻击", "attr1_num": 30.0, "attr1_pct": True, ...}
+        """
+        return self.attr_lexicon.parse(self._clean_text(text))
 
     def _parse_cost_level(self, text):
         """解析COST和等级"""
@@ -191,45 +539,83 @@ class ImageTool:
             "level": int(match.group(2)) if match else 0
         }
 
-    def _match_echo_set(self, region):
-        """匹配声骸套装"""
-        set_dir = "./image/echo_kind"
-        best_match = None
-        best_match_val = 0.5  # 设置初始匹配值阈值
-  
-        # 截取指定区域的图像
-        screen = ImageGrab.grab(bbox=region)
-        image = np.array(screen.convert('L'))  # 转换为灰度图像
-
-        for set_file in os.listdir(set_dir):
-            template_path = os.path.join(set_dir, set_file)
-            template = cv2.imread(template_path, 0)
-            if template is None:
-                continue
+    @metrics.traced("read_cost_level")
+    def read_cost_level(self, image, min_confidence=0.85):
+        """
+        读取 COST 和等级：先用字形图集识别，置信度不足或解析失败时退回 OCR，
+        OCR 结果解析成功时用于扩充字形图集
+        :param image: COST 区域图像数组 (RGB)
+        :param min_confidence: 字形识别的最低匹配值
+        :return: {"cost": int, "level": int}
+        """
+        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        match = self.glyph_reader.read(gray)
+        if match.confidence >= min_confidence:
+            result = self._parse_cost_level(match.text)
+            if result["cost"]:
+                return result
 
-            # 模板匹配
-            res = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
-            _, max_val, _, _ = cv2.minMaxLoc(res)
-        
-            # 如果匹配值大于0.5且匹配值最高，则更新最佳匹配
-            if (max_val > best_match_val):
-                best_match_val = max_val
-                best_match = set_file
+        with metrics.stage("ocr.cost_fallback"):
+            ocr_results = self.read_text(image, detail=1, paragraph=False)
+        # 按文本框从上到下、从左到右拼接
+        ocr_results.sort(key=lambda item: (item[0][0][1], item[0][0][0]))
+        result = self._parse_cost_level(self._clean_text(text for _, text, _ in ocr_results))
+        if result["cost"]:
+            self.glyph_reader.learn(gray, ocr_results)
+        return result
+
+    @metrics.traced("match_echo_set")
+    def _match_echo_set(self, region, frame=None):
+        """
+        匹配声骸套装
+        :param region: 套装图标区域 (left, top, right, bottom)
+        :param frame: 画面快照 ScreenFrame，提供时从快照裁剪而不重新截屏
+        """
+        # 截取指定区域的图像并转换为灰度图像
+        image = frame.crop(region) if frame is not None else self.grab(region)
+        image = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
 
-        return best_match or "未知套装"
+        # 所有套装图标一次向量化打分
+        match = self.set_classifier.classify(image)
+        logger.info(f"匹配套装：{match.name},最大匹配值: {match.score},领先第二名: {match.margin}")
+
+        # 匹配值大于0.5才认为识别成功
+        return match.name if match.score > 0.5 else "未知套装"
     
-    def find_name(self, image_path, echo_data):
+    def find_name(self, image, echo_data, echo_set=None, cost=None, min_confidence=0.65):
         """
-        读取图像中含有“.”的名称
-        :param image_path: 图像路径
+        读取声骸名称，并用 echo.json 中的标准名称纠正 OCR 误识别
+        :param image: 名称区域图像数组 (RGB)，也兼容图片路径
         :param echo_data: echo.json 数据
+        :param echo_set: 已识别的套装编号，用于缩小候选范围
+        :param cost: 已识别的 COST，用于缩小候选范围
+        :param min_confidence: 低于该置信度时保留原始识别结果
         :return: 处理后的名称
         """
-        recognized_name = self._clean_text(self.reader.readtext(image_path, detail=0, paragraph=True))
-        # 将识别的文字中的“.”符号替换为“・”
-        processed_name = recognized_name.replace('.', '・')
-        # 去除处理后的名称中的空格
-        processed_name = processed_name.replace(' ', '')
-        return processed_name
+        recognized_name = self._clean_text(self.read_text(image))
+        return self.resolve_name(recognized_name, echo_data, echo_set, cost, min_confidence)
 
+    def resolve_name(self, recognized_name, echo_data, echo_set=None, cost=None, min_confidence=0.65):
+        """
+        用 echo.json 中的标准名称纠正 OCR 识别出的声骸名称
+        :param recognized_name: OCR 识别出的名称
+        :param echo_data: echo.json 数据
+        :param echo_set: 已识别的套装编号，用于缩小候选范围
+        :param cost: 已识别的 COST，用于缩小候选范围
+        :param min_confidence: 低于该置信度时保留原始识别结果
+        :return: 处理后的名称
+        """
+        # 名称索引只在 echo_data 变化时重建
+        with self._name_resolver_lock:
+            if self._name_resolver is None or self._name_resolver_source is not echo_data:
+                self._name_resolver = EchoNameResolver(echo_data)
+                self._name_resolver_source = echo_data
+            resolver = self._name_resolver
 
+        name, confidence = resolver.resolve(recognized_name, echo_set, cost)
+        if confidence < min_confidence:
+            logger.info(f"声骸名称纠错置信度过低: {recognized_name} -> {name} ({confidence:.2f})")
+            return normalize_name(recognized_name)
+        if name != recognized_name:
+            logger.info(f"声骸名称纠错: {recognized_name} -> {name} ({confidence:.2f})")
+        return name
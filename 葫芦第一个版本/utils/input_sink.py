@@ -0,0 +1,230 @@
+# utils/input_sink.py
+import time
+import queue
+import logging
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from utils.metrics import metrics
+
+# 初始化 logger
+logger = logging.getLogger(__name__)
+
+
+class InputSink(ABC):
+    """
+    鼠标键盘输入接口，整理流程中的点击、按键、滚轮都经由此接口发出
+    输入方法可以返回完成通知 (Future)，供 ImageTool.wait_for_change 等待操作实际发出
+    """
+    @abstractmethod
+    def click(self, x=None, y=None):
+        pass
+
+    @abstractmethod
+    def move_to(self, x, y, duration=0.0):
+        pass
+
+    @abstractmethod
+    def press(self, key):
+        pass
+
+    @abstractmethod
+    def scroll(self, clicks):
+        pass
+
+    @abstractmethod
+    def sleep(self, seconds):
+        """等待界面响应"""
+        pass
+
+
+class PyAutoGuiInputSink(InputSink):
+    """通过 pyautogui 向游戏发送真实输入"""
+    def __init__(self):
+        # pyautogui 在无桌面环境下导入会失败，只在实际发送输入时导入
+        import pyautogui
+        # pyautogui 默认每次调用后固定等待 0.1 秒，改由 PacedInputDriver 控制节奏
+        pyautogui.PAUSE = 0
+        self._gui = pyautogui
+
+    @metrics.traced("input.click")
+    def click(self, x=None, y=None):
+        self._gui.click(x, y)
+
+    @metrics.traced("input.move_to")
+    def move_to(self, x, y, duration=0.0):
+        self._gui.moveTo(x, y, duration=duration)
+
+    @metrics.traced("input.press")
+    def press(self, key):
+        self._gui.press(key)
+
+    @metrics.traced("input.scroll")
+    def scroll(self, clicks):
+        self._gui.scroll(clicks)
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class RecordingInputSink(InputSink):
+    """
+    只记录输入、不实际发送，用于回放测速和回归测试
+    等待不实际休眠，只累计时长
+    """
+    def __init__(self, on_action=None):
+        """
+        :param on_action: 每次输入后的回调 on_action(action, args)，可用于驱动录制画面切换帧
+        """
+        self.actions = []      # [(动作, 参数)]
+        self.slept = 0.0       # 跳过的等待总时长（秒）
+        self.on_action = on_action
+
+    def _record(self, action, *args):
+        self.actions.append((action, args))
+        if self.on_action:
+            self.on_action(action, args)
+
+    def click(self, x=None, y=None):
+        self._record("click", x, y)
+
+    def move_to(self, x, y, duration=0.0):
+        self._record("move_to", x, y)
+
+    def press(self, key):
+        self._record("press", key)
+
+    def scroll(self, clicks):
+        self._record("scroll", clicks)
+
+    def sleep(self, seconds):
+        self.slept += seconds
+
+
+class PacedInputDriver(InputSink):
+    """
+    输入队列：输入方法只把命令放入队列并立即返回完成通知 (Future)，
+    由后台线程按顺序发给实际的 InputSink，相邻两次操作至少间隔 min_interval 秒
+    """
+    def __init__(self, sink, min_interval=0.03):
+        """
+        :param sink: 实际发送输入的 InputSink，测试时可用 RecordingInputSink 空跑
+        :param min_interval: 相邻两次操作的最小间隔（秒）
+        """
+        self.sink = sink
+        self.min_interval = min_interval
+        self._queue = queue.Queue()
+        self._hooks = []
+        self._last = 0.0
+        self._thread = threading.Thread(target=self._run, name="input_driver", daemon=True)
+        self._thread.start()
+
+    def add_hook(self, hook):
+        """
+        注册操作完成回调
+        :param hook: hook(action, args)，每次操作发出后在输入线程中调用
+        """
+        self._hooks.append(hook)
+
+    def _submit(self, action, *args):
+        future = Future()
+        self._queue.put((action, args, future))
+        return future
+
+    def _run(self):
+        while True:
+            action, args, future = self._queue.get()
+            if action is None:
+                future.set_result(time.perf_counter())
+                if args:
+                    # 关闭命令
+                    return
+                continue
+            # 任何异常都只记录到该命令的 Future 上，输入线程继续处理后续命令，
+            # 否则线程退出后 drain/sleep 会一直等不到完成
+            try:
+                self._send(action, args)
+                future.set_result(time.perf_counter())
+            except Exception as e:
+                logger.error(f"输入操作 {action}{args} 失败: {str(e)}")
+                future.set_exception(e)
+                continue
+            for hook in self._hooks:
+                try:
+                    hook(action, args)
+                except Exception as e:
+                    logger.error(f"输入回调处理 {action}{args} 失败: {str(e)}")
+
+    def _send(self, action, args):
+        """按最小间隔发出一次操作"""
+        wait = self._last + self.min_interval - time.perf_counter()
+        if wait > 0:
+            self.sink.sleep(wait)
+        try:
+            getattr(self.sink, action)(*args)
+        finally:
+            self._last = time.perf_counter()
+
+    def click(self, x=None, y=None):
+        return self._submit("click", x, y)
+
+    def move_to(self, x, y, duration=0.0):
+        # 默认瞬间移动，不做移动动画
+        return self._submit("move_to", x, y, duration)
+
+    def press(self, key):
+        return self._submit("press", key)
+
+    def scroll(self, clicks):
+        return self._submit("scroll", clicks)
+
+    def drain(self, timeout=5.0):
+        """
+        等待队列中已有的操作全部发出
+        :param timeout: 超时时间（秒）
+        :return: (bool) 超时前是否已全部发出
+        """
+        try:
+            self._submit(None).result(timeout)
+            return True
+        except FutureTimeoutError:
+            logger.error(f"输入队列 {timeout} 秒内未清空，输入线程存活: {self._thread.is_alive()}")
+            return False
+
+    def sleep(self, seconds):
+        """等待队列清空后再等待 seconds 秒，与直接调用时的时序一致"""
+        self.drain()
+        self.sink.sleep(seconds)
+
+    def close(self, timeout=5.0):
+        """
+        发出剩余操作并停止输入线程
+        :param timeout: 超时时间（秒）
+        """
+        try:
+            self._submit(None, True).result(timeout)
+        except FutureTimeoutError:
+            logger.error("输入线程未能按时停止")
+            return
+        self._thread.join(timeout)
+
+
+# 进程内共用的输入接口，默认在首次使用时创建经由输入队列的 pyautogui 实现
+_input_sink = None
+
+
+def get_input_sink():
+    """获取当前输入接口"""
+    global _input_sink
+    if _input_sink is None:
+        _input_sink = PacedInputDriver(PyAutoGuiInputSink())
+    return _input_sink
+
+
+def set_input_sink(sink):
+    """
+    替换输入接口，如换成 RecordingInputSink 做回放测速
+    :param sink: InputSink 实例，为 None 时恢复默认
+    """
+    global _input_sink
+    _input_sink = sink
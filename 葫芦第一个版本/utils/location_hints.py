@@ -0,0 +1,75 @@
+# utils/location_hints.py
+import os
+import json
+import logging
+import threading
+from utils.file_store import resolution_key, write_text_atomic
+
+# 初始化 logger
+logger = logging.getLogger(__name__)
+
+
+class LocationHints:
+    """
+    模板位置提示：按屏幕分辨率记录每个模板上次被找到的位置，保存到磁盘
+    全屏搜索时先在提示位置附近的小区域内匹配，找不到再搜索全屏
+    """
+    def __init__(self, path="./data/location_hints.json", padding=32):
+        """
+        :param path: 位置提示文件路径，为 None 时不保存
+        :param padding: 搜索区域在提示位置四周扩展的像素
+        """
+        self.path = path
+        self.padding = padding
+        self._hints = {}    # 分辨率 "宽x高" -> {模板路径: [left, top, right, bottom]}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._hints = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f"位置提示读取失败: {str(e)}")
+
+    @staticmethod
+    def _template_key(template_path):
+        return os.path.normpath(template_path).replace("\\", "/")
+
+    def search_region(self, screen_size, template_path):
+        """
+        根据提示得到搜索区域
+        :param screen_size: 屏幕尺寸 (宽, 高)
+        :param template_path: 模板图片路径
+        :return: 搜索区域 (left, top, right, bottom)，没有提示时返回 None
+        """
+        with self._lock:
+            box = self._hints.get(resolution_key(screen_size), {}).get(self._template_key(template_path))
+        if not box:
+            return None
+        return (
+            max(0, box[0] - self.padding),
+            max(0, box[1] - self.padding),
+            min(screen_size[0], box[2] + self.padding),
+            min(screen_size[1], box[3] + self.padding),
+        )
+
+    def update(self, screen_size, template_path, box):
+        """
+        记录模板被找到的位置，位置变化时保存到磁盘
+        :param screen_size: 屏幕尺寸 (宽, 高)
+        :param template_path: 模板图片路径
+        :param box: 匹配位置 (left, top, right, bottom)
+        """
+        box = [int(v) for v in box]
+        with self._lock:
+            hints = self._hints.setdefault(resolution_key(screen_size), {})
+            key = self._template_key(template_path)
+            if hints.get(key) == box:
+                return
+            hints[key] = box
+            snapshot = json.dumps(self._hints, ensure_ascii=False, indent=2)
+        if not self.path:
+            return
+        try:
+            write_text_atomic(self.path, snapshot)
+        except OSError as e:
+            logger.error(f"位置提示保存失败: {str(e)}")
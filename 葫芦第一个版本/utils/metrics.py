@@ -0,0 +1,160 @@
+# utils/metrics.py
+import functools
+import json
+import logging
+import math
+import os
+import time
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+# 初始化 logger
+logger = logging.getLogger(__name__)
+
+# Chrome trace 最多保留的事件数，避免长时间运行占用过多内存
+MAX_TRACE_EVENTS = 200000
+
+
+class StageMetrics:
+    """
+    各处理阶段耗时统计（纳秒），整理流程各阶段用 stage() 或 traced() 计时，
+    测速工具读取 summary()，运行结束时 flush() 输出汇总日志和 Chrome trace 文件
+    """
+    def __init__(self):
+        self._samples = defaultdict(list)   # 阶段名 -> [耗时(ns)]
+        self._events = []                   # Chrome trace 事件 (阶段名, 开始(ns), 耗时(ns), 线程号)
+        self._lock = threading.Lock()
+        self._origin_ns = time.perf_counter_ns()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        统计 with 代码块的耗时
+        :param name: 阶段名
+        """
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter_ns() - start, start)
+
+    def traced(self, name):
+        """
+        装饰器：统计函数每次调用的耗时
+        :param name: 阶段名
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter_ns() - start, start)
+            return wrapper
+        return decorator
+
+    def record(self, name, duration_ns, start_ns=None):
+        """
+        记录一次耗时
+        :param name: 阶段名
+        :param duration_ns: 耗时（纳秒）
+        :param start_ns: 开始时间（perf_counter_ns），提供时同时记录 Chrome trace 事件
+        """
+        with self._lock:
+            self._samples[name].append(duration_ns)
+            if start_ns is not None and len(self._events) < MAX_TRACE_EVENTS:
+                self._events.append((name, start_ns, duration_ns, threading.get_ident()))
+
+    def percentile(self, name, q):
+        """
+        取耗时分位数（最近秩法）
+        :param name: 阶段名
+        :param q: 分位 0~100
+        :return: 耗时（纳秒），无数据时返回 None
+        """
+        samples = sorted(self._samples.get(name, ()))
+        if not samples:
+            return None
+        index = max(0, min(len(samples) - 1, math.ceil(q / 100 * len(samples)) - 1))
+        return samples[index]
+
+    def summary(self):
+        """
+        汇总各阶段耗时
+        :return: {阶段名: {"count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"}}
+        """
+        result = {}
+        for name, samples in list(self._samples.items()):
+            if not samples:
+                continue
+            result[name] = {
+                "count": len(samples),
+                "mean_ms": sum(samples) / len(samples) / 1e6,
+                "p50_ms": self.percentile(name, 50) / 1e6,
+                "p95_ms": self.percentile(name, 95) / 1e6,
+                "p99_ms": self.percentile(name, 99) / 1e6,
+                "max_ms": max(samples) / 1e6,
+            }
+        return result
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self._samples.clear()
+            self._events.clear()
+            self._origin_ns = time.perf_counter_ns()
+
+    def write_chrome_trace(self, path):
+        """
+        输出 Chrome trace 文件，可在 chrome://tracing 或 Perfetto 中查看
+        :param path: 输出文件路径
+        """
+        with self._lock:
+            events = list(self._events)
+        trace = {
+            "traceEvents": [
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start - self._origin_ns) / 1000,
+                    "dur": duration / 1000,
+                    "pid": os.getpid(),
+                    "tid": tid,
+                }
+                for name, start, duration, tid in events
+            ],
+            "displayTimeUnit": "ms",
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(trace, f)
+
+    def flush(self, folder="./logs"):
+        """
+        运行结束时输出耗时汇总到日志，并将 Chrome trace 写入 folder
+        :param folder: trace 文件目录
+        :return: trace 文件路径，没有数据时返回 None
+        """
+        summary = self.summary()
+        if not summary:
+            return None
+        logger.info("== 耗时统计 ==")
+        for name, stats in sorted(summary.items(), key=lambda item: -item[1]["mean_ms"] * item[1]["count"]):
+            logger.info(
+                f"{name}: {stats['count']} 次, 合计 {stats['mean_ms'] * stats['count']:.1f}ms, "
+                f"p50 {stats['p50_ms']:.2f}ms, p95 {stats['p95_ms']:.2f}ms, p99 {stats['p99_ms']:.2f}ms"
+            )
+        path = os.path.join(folder, time.strftime("trace_%Y%m%d_%H%M%S.json"))
+        try:
+            self.write_chrome_trace(path)
+            logger.info(f"Chrome trace 已保存: {path}")
+        except OSError as e:
+            logger.error(f"Chrome trace 保存失败: {str(e)}")
+            return None
+        return path
+
+
+# 进程内共用的阶段耗时统计
+metrics = StageMetrics()
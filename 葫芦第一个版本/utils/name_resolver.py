@@ -0,0 +1,155 @@
+# utils/name_resolver.py
+import difflib
+import os
+from collections import Counter
+
+# OCR 常见的全角/半角差异，统一后再比较
+_NORMALIZE_TABLE = str.maketrans({
+    '（': '(', '）': ')', '.': '・', '·': '・', '•': '・', ' ': None, '　': None,
+})
+
+# 按 n-gram 粗筛后，用 difflib 精排的候选数量
+_RERANK_SIZE = 5
+# 少于此长度的识别结果不做模糊纠错（单字与任何名称都能凑出 0.5 的相似度）
+MIN_QUERY_LENGTH = 2
+# 套装内其它 COST 的名称比当前 COST 下最佳名称的相似度高出此值时，认为是 COST 识别错误
+COST_MISMATCH_MARGIN = 0.15
+
+
+def normalize_name(text):
+    """
+    统一声骸名写法：全角括号转半角、各类圆点统一为“・”、去除空格
+    :param text: 原始名称
+    :return: 统一后的名称
+    """
+    return text.translate(_NORMALIZE_TABLE)
+
+
+def _grams(text):
+    """取名称的单字和相邻双字集合"""
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+class EchoNameResolver:
+    """
+    声骸名称纠错器
+    对 echo.json 中的全部声骸名建立字符 n-gram 倒排索引，并按 (套装编号, COST) 划分范围，
+    将 OCR 识别出的名称映射为标准名称并给出置信度
+    纠错在整个套装内进行：名称明显属于套装内其它 COST 时返回该名称，由决策表给出
+    “声骸名称不在套装对应的COST下”，保留名称与 COST 的交叉校验
+    """
+    def __init__(self, echo_data):
+        """
+        :param echo_data: echo.json 数据
+        """
+        self.names = []          # 名称编号 -> 标准名称
+        self._keys = []          # 名称编号 -> 统一写法
+        self._name_ids = {}      # 统一写法 -> 名称编号
+        self._grams = []         # 名称编号 -> n-gram 集合
+        self._postings = {}      # n-gram -> 名称编号集合
+        self._scopes = {}        # (套装编号, COST) -> 名称编号集合
+
+        for set_data in echo_data.values():
+            for cost in (1, 3, 4):
+                ids = set()
+                for name in set_data.get(f"cost{cost}", []):
+                    ids.add(self._add_name(name))
+                self._scopes[(set_data["num"], cost)] = frozenset(ids)
+
+    def _add_name(self, name):
+        """将名称加入索引，返回名称编号"""
+        key = normalize_name(name)
+        if key in self._name_ids:
+            return self._name_ids[key]
+        name_id = len(self.names)
+        self.names.append(name)
+        self._keys.append(key)
+        self._name_ids[key] = name_id
+        grams = _grams(key)
+        self._grams.append(grams)
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(name_id)
+        return name_id
+
+    def _scope(self, echo_set, cost):
+        """
+        取候选范围
+        :param echo_set: 套装编号（如 "001" 或 "001.png"），为 None 时不限套装
+        :param cost: COST，为 None 时不限 COST
+        :return: 名称编号集合，不限范围时返回 None
+        """
+        if echo_set:
+            echo_set = os.path.splitext(echo_set)[0]
+        if echo_set and cost:
+            return self._scopes.get((echo_set, cost), frozenset())
+        if echo_set or cost:
+            ids = set()
+            for (set_num, set_cost), scope_ids in self._scopes.items():
+                if (not echo_set or set_num == echo_set) and (not cost or set_cost == cost):
+                    ids |= scope_ids
+            return ids
+        return None
+
+    def _best(self, key, scope):
+        """
+        在范围内找与 key 最相似的名称
+        :param key: 统一写法后的识别结果
+        :param scope: 名称编号集合，为 None 时不限范围
+        :return: (名称编号, 相似度)，无候选时返回 (None, 0.0)
+        """
+        # 倒排索引统计共有 n-gram 数量
+        query = _grams(key)
+        counts = Counter()
+        for gram in query:
+            for name_id in self._postings.get(gram, ()):
+                if scope is None or name_id in scope:
+                    counts[name_id] += 1
+        if not counts:
+            return None, 0.0
+
+        # 按 Dice 系数粗筛，再用 difflib 计算编辑相似度精排
+        ranked = sorted(
+            counts,
+            key=lambda i: 2 * counts[i] / (len(query) + len(self._grams[i])),
+            reverse=True
+        )[:_RERANK_SIZE]
+        matcher = difflib.SequenceMatcher(b=key, autojunk=False)
+        best_id, best_ratio = ranked[0], 0.0
+        for name_id in ranked:
+            matcher.set_seq1(self._keys[name_id])
+            ratio = matcher.ratio()
+            if ratio > best_ratio:
+                best_id, best_ratio = name_id, ratio
+        return best_id, best_ratio
+
+    def resolve(self, text, echo_set=None, cost=None):
+        """
+        将 OCR 识别出的名称映射为标准名称
+        :param text: OCR 识别出的名称
+        :param echo_set: 套装编号，用于缩小候选范围
+        :param cost: COST，用于优先选择该 COST 下的名称
+        :return: (标准名称, 置信度 0~1)，无候选时返回 (统一写法后的原文, 0.0)；
+                 名称明显属于其它 COST 时返回该名称，由调用方的 COST 校验报错
+        """
+        key = normalize_name(text)
+        if not key:
+            return "", 0.0
+
+        # 完全一致的标准名称原样返回，即使不在当前套装/COST 下，也不改写成别的声骸
+        name_id = self._name_ids.get(key)
+        if name_id is not None:
+            return self.names[name_id], 1.0
+        if len(key) < MIN_QUERY_LENGTH:
+            return key, 0.0
+
+        # 先在整个套装内找最佳名称，再看当前 COST 下的最佳名称是否足够接近
+        best_id, best_ratio = self._best(key, self._scope(echo_set, None))
+        if best_id is None:
+            return key, 0.0
+        if cost and best_id not in self._scope(echo_set, cost):
+            scoped_id, scoped_ratio = self._best(key, self._scope(echo_set, cost))
+            if scoped_id is not None and best_ratio - scoped_ratio < COST_MISMATCH_MARGIN:
+                return self.names[scoped_id], scoped_ratio
+        return self.names[best_id], best_ratio
@@ -0,0 +1,89 @@
+# utils/ocr_cache.py
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+import cv2
+from utils.template_cache import binarize
+
+# 初始化 logger
+logger = logging.getLogger(__name__)
+
+
+class OcrCache:
+    """
+    OCR 结果的 LRU 缓存，键为二值化后图像内容的哈希
+    同一名称、COST、主词条在整个背包中会反复出现，内容相同的截图直接返回上次的识别结果
+    """
+    def __init__(self, max_entries=4096):
+        """
+        :param max_entries: 最多缓存的条目数，超出时淘汰最久未使用的条目
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(image, *params):
+        """
+        计算缓存键：二值化去除细微的颜色、亮度差异后取哈希
+        :param image: 图像数组，RGB 或灰度
+        :param params: 影响识别结果的其它参数，如 detail、paragraph
+        :return: 缓存键
+        """
+        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY) if image.ndim == 3 else image
+        digest = hashlib.blake2b(binarize(gray).tobytes(), digest_size=16)
+        digest.update(repr((gray.shape, params)).encode())
+        return digest.digest()
+
+    def get(self, key):
+        """
+        查询缓存
+        :param key: 缓存键
+        :return: 识别结果，未命中返回 None
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        写入缓存
+        :param key: 缓存键
+        :param value: 识别结果，应为不可变对象（列表请转为元组），避免调用方修改缓存内容
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """
+        命中统计
+        :return: {"entries", "hits", "misses", "hit_rate"}
+        """
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def clear(self):
+        """清空缓存和统计"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
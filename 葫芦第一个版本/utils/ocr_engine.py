@@ -0,0 +1,127 @@
+# utils/ocr_engine.py
+import os
+import time
+import logging
+import threading
+import numpy as np
+from utils.metrics import metrics
+
+# 初始化 logger
+logger = logging.getLogger(__name__)
+
+# 可选的推理设备
+DEVICES = ("auto", "cpu", "gpu")
+
+
+class OcrEngine:
+    """
+    进程内共用的 easyocr 读取器
+    模型在第一次使用时才加载，所有 ImageTool 共用同一份模型，避免重复占用内存
+    """
+    def __init__(self, languages=("ch_sim", "en"), device="auto", threads=None, warmup=True):
+        """
+        :param languages: easyocr 语言列表
+        :param device: "auto" 有可用 CUDA 时用 GPU，否则 CPU；"gpu" 不可用时回退到 CPU
+        :param threads: CPU 推理线程数，为 None 时取物理核心数的估计值
+        :param warmup: 加载后是否先做一次空白推理，让首个声骸的耗时与后续一致
+        """
+        if device not in DEVICES:
+            raise ValueError(f"未知的推理设备: {device}")
+        self.languages = list(languages)
+        self.device = device
+        self.threads = threads
+        self.warmup = warmup
+        self._reader = None
+        self._lock = threading.Lock()
+        # easyocr.Reader 不是线程安全的，多个识别线程共用时须持有此锁逐个调用
+        self.inference_lock = threading.RLock()
+
+    @property
+    def loaded(self):
+        """模型是否已加载"""
+        return self._reader is not None
+
+    @property
+    def reader(self):
+        """easyocr.Reader，首次访问时加载"""
+        if self._reader is None:
+            self.load()
+        return self._reader
+
+    def load(self):
+        """
+        加载模型（线程安全，重复调用直接返回）
+        :return: easyocr.Reader
+        """
+        with self._lock:
+            if self._reader is not None:
+                return self._reader
+
+            import torch
+            import easyocr
+
+            use_gpu = self._resolve_gpu(torch)
+            if not use_gpu:
+                self._tune_threads(torch)
+
+            start = time.perf_counter()
+            with metrics.stage("ocr.load"):
+                reader = easyocr.Reader(self.languages, gpu=use_gpu)
+            logger.info(f"OCR 模型加载完成（{'GPU' if use_gpu else 'CPU'}），耗时 {time.perf_counter() - start:.2f}s")
+
+            if self.warmup:
+                with metrics.stage("ocr.warmup"):
+                    # 空白图像也会完整走一遍检测和识别网络，提前完成内存分配和算子初始化
+                    reader.readtext(np.zeros((64, 256, 3), dtype=np.uint8), detail=0)
+
+            self._reader = reader
+            return reader
+
+    def _resolve_gpu(self, torch):
+        """按配置和 CUDA 可用性决定是否使用 GPU"""
+        if self.device == "cpu":
+            return False
+        available = torch.cuda.is_available()
+        if self.device == "gpu" and not available:
+            logger.warning("未检测到可用的 CUDA 设备，OCR 改用 CPU 推理")
+        return available
+
+    def _tune_threads(self, torch):
+        """设置 CPU 推理线程数；超线程对卷积推理收益很小，默认按一半逻辑核心计"""
+        threads = self.threads or max(1, (os.cpu_count() or 2) // 2)
+        torch.set_num_threads(threads)
+        try:
+            # 只能在首次并行计算前设置，已设置过时忽略
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass
+        logger.info(f"OCR CPU 推理线程数: {threads}")
+
+
+# 进程内共用的 OCR 引擎，由 get_ocr_engine() 创建
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_ocr_engine():
+    """获取进程内共用的 OCR 引擎（不会立即加载模型）"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = OcrEngine()
+    return _engine
+
+
+def configure_ocr_engine(**kwargs):
+    """
+    按参数重新创建共用 OCR 引擎，需在模型加载前调用
+    :param kwargs: 传给 OcrEngine 的参数，如 device="cpu", threads=4
+    :return: 新的 OcrEngine
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is not None and _engine.loaded:
+            logger.warning("OCR 模型已加载，新的引擎配置将重新加载模型")
+        _engine = OcrEngine(**kwargs)
+        return _engine
@@ -0,0 +1,205 @@
+# utils/screen_source.py
+import os
+import zipfile
+import logging
+import threading
+from abc import ABC, abstractmethod
+import cv2
+import numpy as np
+
+# 初始化 logger
+logger = logging.getLogger(__name__)
+
+# 回放支持的图片格式
+FRAME_EXTENSIONS = (".png", ".jpg", ".bmp")
+
+
+class ScreenSource(ABC):
+    """屏幕画面来源接口，ImageTool 的所有截屏都经由此接口"""
+    # grab 返回的数组是否会被之后的截屏覆盖（环形缓冲），为 True 时需长期保存的画面要先复制
+    transient = False
+
+    @abstractmethod
+    def grab(self, region=None):
+        """
+        截取画面
+        :param region: 截取区域 (left, top, right, bottom)，为 None 时截取全屏
+        :return: 截图数组 (RGB)
+        """
+        pass
+
+
+class LiveScreenSource(ScreenSource):
+    """实时截屏（PIL.ImageGrab）"""
+    def __init__(self):
+        # 仅在实时截屏时才需要 ImageGrab
+        from PIL import ImageGrab
+        self._image_grab = ImageGrab
+
+    def grab(self, region=None):
+        screen = self._image_grab.grab(bbox=region) if region else self._image_grab.grab()
+        return np.array(screen)
+
+
+class FrameRing:
+    """
+    预分配的截屏缓冲环：每种画面尺寸预先分配 slots 个数组，截屏结果依次写入，循环复用
+    返回的数组在之后 slots 次同尺寸截屏后会被覆盖
+    """
+    def __init__(self, slots=4):
+        """
+        :param slots: 每种尺寸的缓冲数
+        """
+        self.slots = slots
+        self._buffers = {}   # 形状 -> [数组]
+        self._next = {}      # 形状 -> 下一个写入位置
+        self._lock = threading.Lock()
+
+    def next(self, shape):
+        """
+        取得下一个可写入的缓冲
+        :param shape: 数组形状 (高, 宽, 通道)
+        :return: 预分配的 uint8 数组
+        """
+        with self._lock:
+            buffers = self._buffers.get(shape)
+            if buffers is None:
+                buffers = self._buffers[shape] = [np.empty(shape, dtype=np.uint8) for _ in range(self.slots)]
+            index = self._next.get(shape, 0)
+            self._next[shape] = (index + 1) % self.slots
+        return buffers[index]
+
+
+class MssScreenSource(ScreenSource):
+    """
+    基于 mss 的快速截屏：Linux 下为 X11 共享内存截取，Windows 下为 GDI BitBlt，
+    只截取所需区域，结果直接转换到预分配的环形缓冲中
+    """
+    transient = True
+
+    def __init__(self, slots=4):
+        """
+        :param slots: 每种截取尺寸的缓冲数
+        """
+        # mss 为可选依赖，未安装时由 create_screen_source 退回 PIL 截屏
+        import mss
+        self._mss = mss
+        # mss 实例不能跨线程使用，每个线程各自创建
+        self._local = threading.local()
+        self.ring = FrameRing(slots)
+
+    def _sct(self):
+        sct = getattr(self._local, "sct", None)
+        if sct is None:
+            sct = self._local.sct = self._mss.mss()
+        return sct
+
+    def grab(self, region=None):
+        sct = self._sct()
+        if region is None:
+            # 与 ImageGrab.grab() 一致，只截取主显示器
+            monitor = sct.monitors[1]
+        else:
+            monitor = {"left": region[0], "top": region[1],
+                       "width": region[2] - region[0], "height": region[3] - region[1]}
+        shot = sct.grab(monitor)
+        height, width = shot.height, shot.width
+        raw = np.frombuffer(shot.raw, dtype=np.uint8).reshape(height, width, 4)
+        out = self.ring.next((height, width, 3))
+        cv2.cvtColor(raw, cv2.COLOR_BGRA2RGB, dst=out)
+        return out
+
+
+# 可选的实时截屏方式
+SCREEN_BACKENDS = {
+    "mss": MssScreenSource,
+    "pil": LiveScreenSource,
+}
+
+
+def create_screen_source(backend="auto"):
+    """
+    创建实时截屏来源
+    :param backend: "mss"、"pil"，或 "auto"（优先 mss，未安装时退回 PIL）
+    :return: ScreenSource 实例
+    """
+    if backend != "auto":
+        return SCREEN_BACKENDS[backend]()
+    try:
+        return MssScreenSource()
+    except ImportError:
+        logger.info("未安装 mss，使用 PIL 截屏")
+        return LiveScreenSource()
+
+
+class PlaybackScreenSource(ScreenSource):
+    """
+    录制画面回放，用于在没有游戏的机器上复现、测速整理流程
+    画面按文件名顺序播放，调用 advance() 切换到下一帧（通常由输入记录器在点击后调用）
+    """
+    def __init__(self, path, loop=True):
+        """
+        :param path: 录制画面目录，或包含画面图片的 zip 压缩包
+        :param loop: 播放到最后一帧后是否从头循环
+        """
+        self.path = path
+        self.loop = loop
+        self._archive = None
+        if os.path.isdir(path):
+            self._names = sorted(
+                name for name in os.listdir(path) if name.lower().endswith(FRAME_EXTENSIONS)
+            )
+        elif zipfile.is_zipfile(path):
+            self._archive = zipfile.ZipFile(path)
+            self._names = sorted(
+                name for name in self._archive.namelist() if name.lower().endswith(FRAME_EXTENSIONS)
+            )
+        else:
+            raise FileNotFoundError(f"录制画面不存在: {path}")
+        if not self._names:
+            raise FileNotFoundError(f"录制画面为空: {path}")
+
+        self.index = 0
+        self._frame = None
+        logger.info(f"已加载录制画面 {len(self._names)} 帧: {path}")
+
+    def __len__(self):
+        return len(self._names)
+
+    @property
+    def finished(self):
+        """不循环播放时，是否已播放完最后一帧"""
+        return not self.loop and self.index >= len(self._names)
+
+    def _load(self, name):
+        """解码一帧画面为 RGB 数组"""
+        if self._archive is not None:
+            data = np.frombuffer(self._archive.read(name), dtype=np.uint8)
+            image = cv2.imdecode(data, cv2.IMREAD_COLOR)
+        else:
+            image = cv2.imread(os.path.join(self.path, name), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError(f"无法解码录制画面: {name}")
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        image.setflags(write=False)
+        return image
+
+    def current(self):
+        """当前帧的完整画面"""
+        if self._frame is None:
+            index = min(self.index, len(self._names) - 1)
+            self._frame = self._load(self._names[index])
+        return self._frame
+
+    def advance(self, *_):
+        """切换到下一帧"""
+        self.index += 1
+        if self.loop:
+            self.index %= len(self._names)
+        self._frame = None
+
+    def grab(self, region=None):
+        frame = self.current()
+        if region is None:
+            return frame
+        return frame[region[1]:region[3], region[0]:region[2]]
@@ -0,0 +1,152 @@
+# utils/scroll_calibration.py
+import os
+import json
+import logging
+import threading
+import cv2
+import numpy as np
+from utils.input_sink import get_input_sink
+from utils.grid_scanner import GRID_ROW_REGION, GRID_ROW_PITCH
+from utils.file_store import resolution_key, write_text_atomic
+
+# 初始化 logger
+logger = logging.getLogger(__name__)
+
+# 未校准时翻一排使用的滚轮值（原先手动调出的经验值）
+DEFAULT_ROW_SCROLL = -933
+# 相位相关峰值低于此值时认为两幅图对不上，结果不可信
+MIN_RESPONSE = 0.1
+# 翻页对齐检查的峰值下限：各排共用相同的格子边框，不同排之间也能得到 0.3 左右的峰值
+ALIGN_MIN_RESPONSE = 0.4
+
+
+def vertical_shift(before, after, scale=2):
+    """
+    相位相关估计两幅同尺寸截图之间的竖直位移
+    :param before: 截图数组 (RGB)
+    :param after: 截图数组 (RGB)
+    :param scale: 计算前缩小的倍数，位移结果已换算回原始像素
+    :return: (位移像素，内容下移为正, 相关峰值 0~1)
+    """
+    images = []
+    for image in (before, after):
+        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        size = (gray.shape[1] // scale, gray.shape[0] // scale)
+        images.append(np.float32(cv2.resize(gray, size, interpolation=cv2.INTER_AREA)))
+    # 汉宁窗抑制边缘带来的假峰
+    window = cv2.createHanningWindow((images[0].shape[1], images[0].shape[0]), cv2.CV_32F)
+    (_, dy), response = cv2.phaseCorrelate(images[0], images[1], window)
+    return dy * scale, response
+
+
+def scroll_and_wait(image_tool, clicks, region=GRID_ROW_REGION, timeout=1.0):
+    """
+    滑动滚轮并等待滚动动画结束
+    :param image_tool: ImageTool 实例
+    :param clicks: 滚轮值，负数向下
+    :param region: 判断画面刷新的区域 (left, top, right, bottom)
+    :param timeout: 等待画面变化、稳定各自的超时时间（秒）
+    :return: (bool) 画面是否发生变化
+    """
+    before = image_tool.frame_hash(region)
+    done = get_input_sink().scroll(clicks)
+    return image_tool.wait_for_update(region, before, timeout=timeout, after=done)
+
+
+class ScrollCalibration:
+    """
+    滚轮校准：按屏幕分辨率记录每个滚轮单位使背包格子移动的像素，保存到磁盘
+    翻一排所需的滚轮值由行距换算，不再依赖手动调出的固定值
+    """
+    def __init__(self, path="./data/scroll_calibration.json", probe=-120):
+        """
+        :param path: 校准文件路径，为 None 时不保存
+        :param probe: 校准时试滑的滚轮值，位移需小于半个行距，否则相位相关会对到相邻一排
+        """
+        self.path = path
+        self.probe = probe
+        self._entries = {}  # 分辨率 "宽x高" -> {"pixels_per_unit": 每个滚轮单位移动的像素}
+        # 本次运行中校准失败的分辨率，不再重复试滑，翻页使用 DEFAULT_ROW_SCROLL
+        self._failed = set()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f"滚轮校准读取失败: {str(e)}")
+
+    def needs_calibration(self, screen_size):
+        """
+        :param screen_size: 屏幕尺寸 (宽, 高)
+        :return: (bool) 该分辨率既没有校准结果，本次运行中也没有校准失败过
+        """
+        key = resolution_key(screen_size)
+        with self._lock:
+            return key not in self._entries and key not in self._failed
+
+    def pixels_per_unit(self, screen_size):
+        """
+        :param screen_size: 屏幕尺寸 (宽, 高)
+        :return: 每个滚轮单位移动的像素（向下滚动内容上移为正），未校准时返回 None
+        """
+        with self._lock:
+            entry = self._entries.get(resolution_key(screen_size))
+        return entry["pixels_per_unit"] if entry else None
+
+    def row_scroll(self, screen_size):
+        """
+        :param screen_size: 屏幕尺寸 (宽, 高)
+        :return: 翻一排所需的滚轮值，未校准时返回 DEFAULT_ROW_SCROLL
+        """
+        ppu = self.pixels_per_unit(screen_size)
+        return -round(GRID_ROW_PITCH / ppu) if ppu else DEFAULT_ROW_SCROLL
+
+    def correction(self, screen_size, offset):
+        """
+        把残余位移换算为修正用的滚轮值
+        :param screen_size: 屏幕尺寸 (宽, 高)
+        :param offset: 内容相对目标位置的位移像素，偏下为正
+        :return: 滚轮值
+        """
+        # 未校准时按经验值翻一排正好一个行距估算
+        ppu = self.pixels_per_unit(screen_size) or GRID_ROW_PITCH / -DEFAULT_ROW_SCROLL
+        return -round(offset / ppu)
+
+    def calibrate(self, image_tool, region=GRID_ROW_REGION, timeout=1.0):
+        """
+        试滑一次并用相位相关测量格子的位移，得到每个滚轮单位移动的像素，测完后滑回原位
+        :param image_tool: ImageTool 实例
+        :param region: 测量区域 (left, top, right, bottom)
+        :param timeout: 等待滚动动画结束的最长时间（秒）
+        :return: 每个滚轮单位移动的像素，测量失败返回 None
+        """
+        screen_size = image_tool.screen_size()
+        before = image_tool.grab(region).copy()
+        scroll_and_wait(image_tool, self.probe, region, timeout)
+        after = image_tool.grab(region)
+        dy, response = vertical_shift(before, after)
+        # 滑回原位，不打乱当前处理的排
+        scroll_and_wait(image_tool, -self.probe, region, timeout)
+
+        # 向下滚动（滚轮值为负）时内容上移（位移为负），两者同号
+        ppu = dy / self.probe
+        if response < MIN_RESPONSE or abs(dy) < 1 or ppu <= 0:
+            logger.warning(f"滚轮校准失败，本次运行使用默认滚轮值 {DEFAULT_ROW_SCROLL}: "
+                           f"位移 {dy:.1f}，相关峰值 {response:.2f}")
+            with self._lock:
+                self._failed.add(resolution_key(screen_size))
+            return None
+
+        logger.info(f"滚轮校准 {resolution_key(screen_size)}: 每单位 {ppu:.4f} 像素，"
+                    f"翻一排滚轮值 {-round(GRID_ROW_PITCH / ppu)}")
+        with self._lock:
+            self._entries[resolution_key(screen_size)] = {"pixels_per_unit": ppu}
+            self._failed.discard(resolution_key(screen_size))
+            snapshot = json.dumps(self._entries, ensure_ascii=False, indent=2)
+        if self.path:
+            try:
+                write_text_atomic(self.path, snapshot)
+            except OSError as e:
+                logger.error(f"滚轮校准保存失败: {str(e)}")
+        return ppu
@@ -0,0 +1,73 @@
+# utils/set_classifier.py
+import os
+import logging
+from collections import namedtuple
+import cv2
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# 初始化 logger
+logger = logging.getLogger(__name__)
+
+# 套装识别结果：套装图标文件名、最高匹配值、第一名与第二名的匹配值差
+SetMatch = namedtuple("SetMatch", ["name", "score", "margin"])
+
+
+class SetIconClassifier:
+    """
+    声骸套装图标分类器
+    启动时一次性加载 echo_kind 目录下的全部套装图标，居中裁剪为统一尺寸后
+    做零均值、单位范数归一化并堆叠为一个矩阵，识别时一次矩阵乘法即可得到
+    所有套装在所有位置上的归一化相关系数（等价于 TM_CCOEFF_NORMED）
+    """
+    def __init__(self, set_dir="./image/echo_kind"):
+        """
+        :param set_dir: 套装图标目录，文件名即套装编号（如 001.png）
+        """
+        self.set_dir = set_dir
+        self.names = []
+        icons = []
+        for set_file in sorted(os.listdir(set_dir)):
+            icon = cv2.imread(os.path.join(set_dir, set_file), 0)
+            if icon is None:
+                continue
+            self.names.append(set_file)
+            icons.append(icon)
+        if not icons:
+            raise FileNotFoundError(f"套装图标目录为空: {set_dir}")
+
+        # 统一尺寸取所有图标的最小宽高，居中裁剪以保持原始比例
+        self.size = (min(i.shape[0] for i in icons), min(i.shape[1] for i in icons))
+        stacked = np.stack([self._center_crop(i, self.size) for i in icons]).astype(np.float32)
+        self.templates = self._normalize(stacked.reshape(len(icons), -1))
+        logger.info(f"已加载套装图标 {len(self.names)} 个，统一尺寸 {self.size}")
+
+    @staticmethod
+    def _center_crop(image, size):
+        """将图像居中裁剪为 size=(h, w)"""
+        top = (image.shape[0] - size[0]) // 2
+        left = (image.shape[1] - size[1]) // 2
+        return image[top:top + size[0], left:left + size[1]]
+
+    @staticmethod
+    def _normalize(rows):
+        """逐行零均值并缩放为单位范数"""
+        rows = rows - rows.mean(axis=1, keepdims=True)
+        norms = np.linalg.norm(rows, axis=1, keepdims=True)
+        return rows / np.maximum(norms, 1e-6)
+
+    def classify(self, image):
+        """
+        识别灰度截图中的套装图标
+        :param image: 套装图标区域的灰度图像数组，尺寸需不小于统一图标尺寸
+        :return: SetMatch(name, score, margin)
+        """
+        windows = sliding_window_view(image.astype(np.float32), self.size)
+        windows = self._normalize(windows.reshape(-1, self.size[0] * self.size[1]))
+        # (位置数, 套装数) 的相关系数矩阵，按列取最大值得到每个套装的最高匹配值
+        scores = (windows @ self.templates.T).max(axis=0)
+
+        if len(scores) == 1:
+            return SetMatch(self.names[0], float(scores[0]), float(scores[0]))
+        second, first = np.argpartition(scores, -2)[-2:]
+        return SetMatch(self.names[first], float(scores[first]), float(scores[first] - scores[second]))
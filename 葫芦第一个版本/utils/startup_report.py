@@ -0,0 +1,88 @@
+# utils/startup_report.py
+import sys
+import time
+import builtins
+import logging
+import threading
+
+# 初始化 logger
+logger = logging.getLogger(__name__)
+
+
+class StartupReport:
+    """
+    启动耗时报告：记录各启动阶段的时间点，并按 python -X importtime 的格式统计模块导入耗时
+    通过 main.py --startup-report 启用
+    """
+    def __init__(self):
+        self.enabled = False
+        self._start_ns = time.perf_counter_ns()
+        self._phases = []       # [(阶段名, 距启动的耗时(ns))]
+        self._imports = []      # [(模块名, 自身耗时(ns), 累计耗时(ns), 嵌套层级)]
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._original_import = None
+
+    def install(self):
+        """开始统计模块导入耗时，应在导入界面模块之前调用"""
+        if self._original_import is not None:
+            return
+        self.enabled = True
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+
+    def uninstall(self):
+        """停止统计模块导入耗时"""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        """替代 builtins.__import__，只对首次导入的模块计时"""
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        # 每个线程单独维护嵌套栈，栈顶累计子模块的导入耗时
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append(0)
+        start = time.perf_counter_ns()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            cumulative = time.perf_counter_ns() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += cumulative
+            with self._lock:
+                self._imports.append((name, cumulative - children, cumulative, len(stack)))
+
+    def mark(self, phase):
+        """
+        记录启动阶段完成的时间点
+        :param phase: 阶段名
+        """
+        with self._lock:
+            self._phases.append((phase, time.perf_counter_ns() - self._start_ns))
+
+    def report(self, top=20):
+        """
+        输出启动报告到日志（未启用时不输出）
+        :param top: 列出累计耗时最长的导入数
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            phases = list(self._phases)
+            imports = sorted(self._imports, key=lambda item: -item[2])[:top]
+
+        logger.info("== 启动耗时 ==")
+        for phase, elapsed in phases:
+            logger.info(f"{elapsed / 1e6:>10.1f}ms  {phase}")
+        logger.info(f"== 导入耗时 Top {top} ==")
+        logger.info("import time:  self [us] | cumulative | imported package")
+        for name, self_ns, cumulative_ns, depth in imports:
+            logger.info(f"import time: {self_ns // 1000:>10} | {cumulative_ns // 1000:>10} | {'  ' * depth}{name}")
+
+
+# 进程内共用的启动耗时报告
+startup_report = StartupReport()
@@ -0,0 +1,98 @@
+# utils/template_cache.py
+import os
+import threading
+import logging
+import cv2
+
+# 初始化 logger
+logger = logging.getLogger(__name__)
+
+# 默认预处理参数：高斯模糊核大小、自适应二值化邻域大小、自适应二值化常数
+DEFAULT_BLUR_KSIZE = 3
+DEFAULT_BLOCK_SIZE = 11
+DEFAULT_THRESH_C = 2
+
+
+def binarize(image, blur_ksize=DEFAULT_BLUR_KSIZE, block_size=DEFAULT_BLOCK_SIZE, c=DEFAULT_THRESH_C):
+    """
+    灰度图预处理：高斯模糊去噪 + 自适应二值化，屏幕截图和模板使用同一套处理
+    :param image: 灰度图像数组
+    :param blur_ksize: 高斯模糊核大小
+    :param block_size: 自适应二值化邻域大小
+    :param c: 自适应二值化常数
+    :return: 二值化后的图像数组
+    """
+    image = cv2.GaussianBlur(image, (blur_ksize, blur_ksize), 0)
+    return cv2.adaptiveThreshold(image, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                 cv2.THRESH_BINARY, block_size, c)
+
+
+class TemplateCache:
+    """
+    模板图片缓存，保存已经预处理好的模板
+    缓存键为 (路径, 是否灰度, 模糊核大小, 二值化邻域大小, 二值化常数, 缩小倍数)，文件修改时间变化时自动重新加载
+    """
+    def __init__(self):
+        # 缓存键 -> (文件修改时间, 预处理后的模板)
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def get(self, path, grayscale=True, blur_ksize=DEFAULT_BLUR_KSIZE,
+            block_size=DEFAULT_BLOCK_SIZE, c=DEFAULT_THRESH_C, scale=1):
+        """
+        获取预处理后的模板
+        :param path: 模板图片路径
+        :param grayscale: 是否灰度匹配（灰度时做模糊和二值化）
+        :param blur_ksize: 高斯模糊核大小
+        :param block_size: 自适应二值化邻域大小
+        :param c: 自适应二值化常数
+        :param scale: 缩小倍数，用于金字塔粗匹配（仅灰度），先缩小再二值化
+        :return: 模板图像数组
+        """
+        key = (os.path.abspath(path), grayscale, blur_ksize, block_size, c, scale)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            raise FileNotFoundError(f"模板图片不存在: {path}")
+
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+
+        template = cv2.imread(path, 0 if grayscale else 1)
+        if template is None:
+            raise FileNotFoundError(f"模板图片不存在: {path}")
+        if grayscale:
+            if scale > 1:
+                size = (max(1, template.shape[1] // scale), max(1, template.shape[0] // scale))
+                template = cv2.resize(template, size, interpolation=cv2.INTER_AREA)
+            template = binarize(template, blur_ksize, block_size, c)
+
+        with self._lock:
+            self._cache[key] = (mtime, template)
+        return template
+
+    def preload(self, folder="./image", grayscale=True):
+        """
+        启动时预加载目录下的全部模板，避免首次识别时读取磁盘
+        :param folder: 模板目录（递归遍历子目录）
+        :param grayscale: 是否按灰度匹配的方式预处理
+        :return: (int) 预加载的模板数量
+        """
+        count = 0
+        for root, _, files in os.walk(folder):
+            for name in files:
+                if not name.lower().endswith(".png"):
+                    continue
+                try:
+                    self.get(os.path.join(root, name), grayscale)
+                    count += 1
+                except FileNotFoundError as e:
+                    logger.warning(str(e))
+        logger.info(f"已预加载模板 {count} 个: {folder}")
+        return count
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._cache.clear()